@@ -1,7 +1,10 @@
 from fastapi import APIRouter, FastAPI
 from fastapi.responses import ORJSONResponse
 
+from .metrics import metrics_router
+
 root_router = APIRouter()
+root_router.include_router(metrics_router)
 
 
 def init_routers(app: FastAPI):
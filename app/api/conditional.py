@@ -0,0 +1,117 @@
+"""
+Conditional GET based on the `CommonMixin` timestamps.
+
+The ETag of an object is built from its `id` and `updated_at` (or `created_at`, if it was never updated),
+the ETag of a page is built from the total and the IDs with the versions of its items (see `get_page_version`).
+Both include the path and the query string of the request, which covers the filter, the ordering, the pagination
+params and the sparse fieldset. If the client sends a matching `If-None-Match`, the endpoint answers
+`304 Not Modified` right after a metadata-only query, skipping the row fetch and the serialization.
+Without `If-None-Match` the ETag is built from the fetched objects, so no extra query is made:
+    ```python
+    @example_router.get("/{obj_id}", response_model=ExampleDetail)
+    async def get_example(
+        obj_id: UUID, service: Annotated[ExampleService, Depends()], conditional: Annotated[ConditionalGet, Depends()]
+    ):
+        if conditional.if_none_match and conditional.is_not_modified(obj_id, await service.get_version(obj_id)):
+            return conditional.not_modified()
+
+        obj = await service.get(obj_id)
+
+        return SerializedResponse(obj, ExampleDetail, headers=conditional.get_headers(obj.id, get_entity_version(obj)))
+
+
+    @example_router.get("", response_model=Page[ExampleDetail])
+    async def get_examples(
+        service: Annotated[ExampleService, Depends()], conditional: Annotated[ConditionalGet, Depends()]
+    ):
+        if conditional.if_none_match and conditional.is_not_modified(await service.get_all_version()):
+            return conditional.not_modified()
+
+        page = await service.get_all()
+
+        return SerializedResponse(page, Page[ExampleDetail], headers=conditional.get_headers(get_page_version(page)))
+    ```
+
+The versions don't cover the related rows, which the response schema may serialize,
+see `CRUDRepository.get_all_version` for the limits.
+"""
+
+import hashlib
+from typing import Any
+
+import orjson
+from fastapi import Request
+from starlette import status
+from starlette.responses import Response
+
+
+def make_etag(*parts: Any) -> str:
+    """
+    Builds a strong ETag from the parts, e.g. the ID and the version of an object.
+    """
+    digest: str = hashlib.blake2b(orjson.dumps(parts, default=str), digest_size=16).hexdigest()
+
+    return f'"{digest}"'
+
+
+def parse_etags(header: str) -> list[str]:
+    """
+    Parses the list of entity tags of `If-None-Match` header. The weak tags are compared as strong,
+    because `If-None-Match` uses the weak comparison.
+    """
+    return [tag.strip().removeprefix("W/") for tag in header.split(",") if tag.strip()]
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """
+    Checks if `If-None-Match` header matches the ETag.
+    """
+    if not if_none_match:
+        return False
+
+    tags: list[str] = parse_etags(if_none_match)
+
+    return "*" in tags or etag in tags
+
+
+class ConditionalGet:
+    """
+    Dependency, which builds the ETags of the response and checks them against `If-None-Match` header.
+
+    :param request: Current request.
+    """
+
+    def __init__(self, request: Request):
+        self.if_none_match: str | None = request.headers.get("if-none-match")
+        self.resource: str = f"{request.url.path}?{request.url.query}"
+        self.etag: str | None = None
+
+    def get_etag(self, *parts: Any) -> str:
+        """
+        Builds the ETag of the response for the current path and query string.
+        """
+        self.etag = make_etag(self.resource, *parts)
+
+        return self.etag
+
+    def is_not_modified(self, *parts: Any) -> bool:
+        """
+        Checks if the client already has the representation with these version parts.
+        The parts with None (e.g. the version of a missing object) never match, so the endpoint responds as usual.
+        """
+        if any(part is None for part in parts):
+            return False
+
+        return etag_matches(self.if_none_match, self.get_etag(*parts))
+
+    def get_headers(self, *parts: Any) -> dict[str, str]:
+        """
+        Returns the headers of the full response.
+        """
+        return {"ETag": self.get_etag(*parts)}
+
+    def not_modified(self) -> Response:
+        """
+        Returns `304 Not Modified` response with the matched ETag.
+        """
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": self.etag} if self.etag else None)
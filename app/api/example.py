@@ -1,8 +1,13 @@
 from typing import Annotated
+from uuid import UUID
 
 from fastapi import APIRouter, Depends
 
+from app.api.conditional import ConditionalGet
+from app.api.serialization import SerializedResponse
+from app.core.cache import get_entity_version
 from app.core.enums import ApiTagEnum
+from app.core.pagination import Page, get_page_version
 from app.domain.example.schemas import ExampleCreate, ExampleDetail
 from app.domain.example.services import ExampleService
 
@@ -14,4 +19,31 @@ async def create_example(
     example_data: ExampleCreate,
     service: Annotated[ExampleService, Depends()],
 ):
-    return await service.create(obj=example_data)
+    return SerializedResponse(await service.create(obj=example_data), ExampleDetail)
+
+
+@example_router.get("", response_model=Page[ExampleDetail])
+async def get_examples(
+    service: Annotated[ExampleService, Depends()],
+    conditional: Annotated[ConditionalGet, Depends()],
+):
+    if conditional.if_none_match and conditional.is_not_modified(await service.get_all_version()):
+        return conditional.not_modified()
+
+    page = await service.get_all()
+
+    return SerializedResponse(page, Page[ExampleDetail], headers=conditional.get_headers(get_page_version(page)))
+
+
+@example_router.get("/{obj_id}", response_model=ExampleDetail)
+async def get_example(
+    obj_id: UUID,
+    service: Annotated[ExampleService, Depends()],
+    conditional: Annotated[ConditionalGet, Depends()],
+):
+    if conditional.if_none_match and conditional.is_not_modified(obj_id, await service.get_version(obj_id)):
+        return conditional.not_modified()
+
+    obj = await service.get(obj_id)
+
+    return SerializedResponse(obj, ExampleDetail, headers=conditional.get_headers(obj.id, get_entity_version(obj)))
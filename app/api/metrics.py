@@ -0,0 +1,26 @@
+from typing import Any
+
+from fastapi import APIRouter
+
+from app.core.cache import get_entity_cache_stats, get_result_cache_stats
+from app.core.enums import ApiTagEnum
+from app.core.pagination import count_cache
+from app.db.pool import get_pool_stats
+from app.db.statement_cache import get_statement_cache_stats
+
+metrics_router = APIRouter(prefix="/metrics", tags=[ApiTagEnum.METRICS])
+
+
+@metrics_router.get("/cache")
+async def get_cache_metrics() -> dict[str, dict[str, int]]:
+    return get_entity_cache_stats() | get_result_cache_stats() | {"count_cache": count_cache.stats()}
+
+
+@metrics_router.get("/statements")
+async def get_statement_cache_metrics() -> dict[str, int | float]:
+    return get_statement_cache_stats()
+
+
+@metrics_router.get("/pool")
+async def get_pool_metrics() -> dict[str, dict[str, Any]]:
+    return get_pool_stats()
@@ -0,0 +1,166 @@
+"""
+Response serialization in a single pass.
+
+When an endpoint returns an ORM object with `response_model=...`, FastAPI validates it into the schema from attributes,
+dumps the schema into python objects, and `ORJSONResponse` encodes those objects into JSON once again.
+
+`SerializedResponse` takes the serializer of the schema, which is built once per schema (see `get_serializer`):
+ORM objects are passed to the validator as dictionaries of their loaded attributes, which is several times faster
+than the validation from attributes, and the validated schema is dumped straight into JSON bytes by pydantic-core.
+Content, which is already an instance of the schema, isn't validated again.
+
+The endpoints keep `response_model` for the OpenAPI schema, FastAPI doesn't apply it to the returned responses:
+    ```python
+    @example_router.get("/{obj_id}", response_model=ExampleDetail)
+    async def get_example(obj_id: UUID, service: Annotated[ExampleService, Depends()]):
+        return SerializedResponse(await service.get(obj_id), ExampleDetail)
+
+
+    @example_router.get("", response_model=Page[ExampleDetail])
+    async def get_examples(service: Annotated[ExampleService, Depends()]):
+        return SerializedResponse(await service.get_all(), Page[ExampleDetail])
+    ```
+
+Run `python -m benchmarks.serialization` to compare it with the `response_model` path.
+"""
+
+from functools import cache
+from typing import Any, Mapping, get_args
+
+from fastapi_pagination.bases import AbstractPage
+from pydantic import BaseModel, TypeAdapter
+from starlette.background import BackgroundTask
+from starlette.responses import Response
+
+_MISSING = object()
+
+
+def _get_attribute_names(schema: Any) -> list[tuple[str, ...]] | None:
+    """
+    Returns the names of the attributes, which the validation from attributes would read.
+
+    :return: Candidate names of each field in the order they are tried (the alias, then the field name if the schema
+             populates fields by name), or None if the schema can't be validated from a dictionary of the attributes,
+             e.g. it has `before` model validators, which expect the object itself, or alias paths.
+    """
+    if not isinstance(schema, type) or not issubclass(schema, BaseModel):
+        return None
+
+    if any(decorator.info.mode != "after" for decorator in schema.__pydantic_decorators__.model_validators.values()):
+        return None
+
+    populate_by_name: bool = bool(schema.model_config.get("populate_by_name"))
+    names: list[tuple[str, ...]] = []
+
+    for name, field_info in schema.model_fields.items():
+        alias = field_info.validation_alias if field_info.validation_alias is not None else field_info.alias
+
+        if alias is not None and not isinstance(alias, str):
+            return None
+
+        if alias is None or alias == name:
+            names.append((name,))
+        else:
+            names.append((alias, name) if populate_by_name else (alias,))
+
+    return names
+
+
+class ResponseSerializer:
+    """
+    Validator and serializer of a response schema.
+
+    :param schema: Response schema, e.g. `ExampleDetail` or `Page[ExampleDetail]`.
+    """
+
+    def __init__(self, schema: Any):
+        self.schema = schema
+        self.adapter: TypeAdapter = TypeAdapter(schema)
+        self.attribute_names: list[tuple[str, ...]] | None = _get_attribute_names(schema)
+        self.items_serializer: ResponseSerializer | None = None
+
+        if isinstance(schema, type) and issubclass(schema, AbstractPage):
+            # Items of `Page[T]` are annotated as `Sequence[T]`
+            if item_schema := get_args(schema.model_fields["items"].annotation):
+                self.items_serializer = get_serializer(item_schema[0])
+
+    def prepare(self, content: Any) -> Any:
+        """
+        Converts the ORM objects into the dictionaries of their attributes.
+        """
+        if isinstance(self.schema, type) and type(content) is self.schema:
+            return content
+
+        if self.items_serializer is not None and isinstance(content, AbstractPage):
+            return content.__dict__ | {"items": [self.items_serializer.prepare(item) for item in content.items]}
+
+        if self.attribute_names is not None and hasattr(content, "_sa_instance_state"):
+            return self._get_attributes(content)
+
+        return content
+
+    def _get_attributes(self, obj: Any) -> dict[str, Any]:
+        """
+        Reads the attributes of the ORM object the same way the validation from attributes does. Loaded attributes are
+        taken from the state, the rest (e.g. properties) are read as usual. Fields without an attribute are left out,
+        so their defaults apply.
+        """
+        state: dict[str, Any] = obj.__dict__
+        attributes: dict[str, Any] = {}
+
+        for candidates in self.attribute_names:  # type: ignore[union-attr]
+            for name in candidates:
+                if name in state:
+                    attributes[name] = state[name]
+                    break
+
+                if (value := getattr(obj, name, _MISSING)) is not _MISSING:
+                    attributes[name] = value
+                    break
+
+        return attributes
+
+    def serialize(self, content: Any) -> bytes:
+        value = self.adapter.validate_python(self.prepare(content), from_attributes=True)
+
+        return self.adapter.dump_json(value, by_alias=True)
+
+
+@cache
+def get_serializer(schema: Any) -> ResponseSerializer:
+    """
+    Returns the serializer of the schema, the validator and the serializer are built on the first call only.
+    Parametrized generics (e.g. `Page[ExampleDetail]`) are cached by pydantic, so they hit the cache as well.
+    """
+    return ResponseSerializer(schema)
+
+
+def serialize(content: Any, schema: Any) -> bytes:
+    """
+    Validates the content into the schema and encodes it into JSON, the same way FastAPI encodes `response_model`.
+
+    :param content: ORM object, dictionary, or a `Page` of them.
+    :param schema: Response schema, e.g. `ExampleDetail` or `Page[ExampleDetail]`.
+    """
+    return get_serializer(schema).serialize(content)
+
+
+class SerializedResponse(Response):
+    """
+    JSON response, which is serialized with the cached serializer of the schema.
+
+    :param content: ORM object, dictionary, or a `Page` of them.
+    :param schema: Response schema, usually the same as the `response_model` of the endpoint.
+    """
+
+    media_type = "application/json"
+
+    def __init__(
+        self,
+        content: Any,
+        schema: Any,
+        status_code: int = 200,
+        headers: Mapping[str, str] | None = None,
+        background: BackgroundTask | None = None,
+    ):
+        super().__init__(serialize(content, schema), status_code, headers, self.media_type, background)
@@ -5,7 +5,7 @@ from urllib.parse import quote_plus
 from pydantic_settings import BaseSettings as PydanticSettings
 from pydantic_settings import SettingsConfigDict
 
-from app.core.enums import AppEnvEnum
+from app.core.enums import AppEnvEnum, ReplicaRoutingEnum
 from app.core.logging import Logger
 
 
@@ -24,10 +24,30 @@ class DBSettings(BaseSettings):
 
     pool_size: int = 20
     max_overflow: int = 15
+    # Commit read-only transactions right after the repository reads, so the connections aren't held idle.
+    release_idle_connections: bool = True
+    # Connection checkouts, which waited longer than this number of seconds, are logged.
+    pool_checkout_warning_threshold: float = 0.1
+
+    # Size of the SQLAlchemy cache of compiled statements per engine.
+    query_cache_size: int = 500
+    # Size of the asyncpg cache of prepared statements per connection, 0 disables it (e.g. behind PgBouncer).
+    prepared_statement_cache_size: int = 100
+
+    # Read replicas as "host" or "host:port", they share the credentials and the database name with the primary.
+    replica_hosts: list[str] = []
+    replica_routing: ReplicaRoutingEnum = ReplicaRoutingEnum.ROUND_ROBIN
 
     @property
     def db_url(self) -> str:
-        return f"postgresql+asyncpg://{self.user}:{quote_plus(self.password)}@{self.host}:{self.port}/{self.name}"
+        return self._get_url(self.host, self.port)
+
+    @property
+    def replica_urls(self) -> list[str]:
+        return [self._get_url(*replica_host.partition(":")[::2]) for replica_host in self.replica_hosts]
+
+    def _get_url(self, host: str, port: int | str | None = None) -> str:
+        return f"postgresql+asyncpg://{self.user}:{quote_plus(self.password)}@{host}:{port or self.port}/{self.name}"
 
 
 class CORSSettings(BaseSettings):
@@ -39,9 +59,41 @@ class CORSSettings(BaseSettings):
     allow_credentials: bool = True
 
 
+class CacheSettings(BaseSettings):
+    model_config = SettingsConfigDict(extra="allow", env_prefix="CACHE_")
+
+    entity_maxsize: int = 10_000
+    entity_ttl: float = 60.0
+    # Postgres LISTEN/NOTIFY channel to share invalidations between workers, None disables it.
+    invalidation_channel: str | None = None
+    # Totals of the list endpoints, which are requested with the `cached` count strategy.
+    count_maxsize: int = 1_000
+    count_ttl: float = 30.0
+    # Pages of the list endpoints of the repositories with `result_cache`.
+    result_maxsize: int = 1_000
+    result_ttl: float = 5.0
+
+
+class QuerySettings(BaseSettings):
+    model_config = SettingsConfigDict(extra="allow", env_prefix="QUERY_")
+
+    accounting_enabled: bool = True
+    # Maximum number of statements per request, None disables the budget.
+    max_statements_per_request: int | None = 50
+    # The same statement executed this many times within a request is reported as a likely N+1 query.
+    n_plus_one_threshold: int = 10
+
+    # Statements running longer than this number of seconds are logged, None disables the slow query log.
+    slow_threshold: float | None = 0.5
+    # Share of the slow SELECT statements, which are re-run with EXPLAIN (ANALYZE, BUFFERS), 0 disables it.
+    explain_sample_rate: float = 0.0
+
+
 class Settings(BaseSettings):
     db: DBSettings = DBSettings()
     cors: CORSSettings = CORSSettings()
+    cache: CacheSettings = CacheSettings()
+    query: QuerySettings = QuerySettings()
 
     environment: AppEnvEnum = AppEnvEnum.PRODUCTION
     log_level: Literal["INFO", "DEBUG", "WARN", "ERROR"] = "INFO"
@@ -0,0 +1,342 @@
+"""
+In-process caches.
+
+`TTLCache` is a bounded LRU mapping with per-entry expiration and hit/miss/eviction counters.
+
+`EntityCache` is a read-through cache of `CRUDRepository.get`. It's enabled per repository class:
+    ```python
+    class ExampleRepository(CRUDRepository[...]):
+        sql_model = Example
+        entity_cache = EntityCache(maxsize=10_000, ttl=30)
+    ```
+
+Writes through the repository invalidate the cached entities. Every invalidation leaves a tombstone with the new
+version of the entity (`CommonMixin.updated_at`), so a concurrent read, which started before the write,
+can't put the stale row back into the cache. Invalidations are also published to other workers after commit,
+see `app.db.notifications`.
+
+`ResultCache` caches the pages of `CRUDRepository.get_all`:
+    ```python
+    class ExampleRepository(CRUDRepository[...]):
+        sql_model = Example
+        result_cache = ResultCache(maxsize=1_000, ttl=5)
+    ```
+
+The keys of the pages include the write versions of the tables the filter reads. Every write through the repository
+bumps the version of its table (right away and once more after commit), so the pages cached before the write
+are never hit again, and are evicted by the LRU/TTL bounds.
+"""
+
+import copy
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+from time import monotonic
+from typing import Any, Callable, Generic, Hashable, Iterable, TypeVar
+
+from pydantic import TypeAdapter
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, SessionTransaction
+
+from app.config import config
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+PENDING_INVALIDATIONS_KEY: str = "cache_pending_invalidations"
+
+# (table name, object ID, version of the object after the write), the object ID is None for table-level writes
+Invalidation = tuple[str, Any, datetime | None]
+
+
+class TTLCache(Generic[K, V]):
+    """
+    Least-recently-used cache with a size bound and time-to-live of the entries.
+
+    :param maxsize: Maximum number of entries, the least recently used entries are evicted first.
+    :param ttl: Time-to-live of the entries in seconds.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict[K, tuple[float, V]] = OrderedDict()
+
+        self.hits: int = 0
+        self.misses: int = 0
+        self.evictions: int = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: K) -> V | None:
+        if (value := self.peek(key)) is None:
+            self.misses += 1
+            return None
+
+        self._data.move_to_end(key)
+        self.hits += 1
+
+        return value
+
+    def peek(self, key: K) -> V | None:
+        """
+        Returns the value without touching the counters and the LRU order.
+        """
+        if (item := self._data.get(key)) is None:
+            return None
+
+        expires_at, value = item
+
+        if expires_at <= monotonic():
+            del self._data[key]
+            return None
+
+        return value
+
+    def set(self, key: K, value: V) -> None:
+        self._data[key] = (monotonic() + self.ttl, value)
+        self._data.move_to_end(key)
+
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def pop(self, key: K) -> V | None:
+        item = self._data.pop(key, None)
+
+        return item[1] if item else None
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+        }
+
+
+@dataclass(frozen=True, slots=True)
+class _Tombstone:
+    version: datetime | None
+
+
+def get_entity_version(obj: Any) -> datetime | None:
+    """
+    Version of the entity based on the `CommonMixin` timestamps.
+    """
+    return getattr(obj, "updated_at", None) or getattr(obj, "created_at", None)
+
+
+class EntityCache:
+    """
+    Read-through cache of the model entities, which are stored as dictionaries of column values.
+
+    :param maxsize: Maximum number of cached entities. Default is `CACHE_ENTITY_MAXSIZE` setting.
+    :param ttl: Time-to-live of the cached entities in seconds. Default is `CACHE_ENTITY_TTL` setting.
+    """
+
+    def __init__(self, maxsize: int | None = None, ttl: float | None = None):
+        self.maxsize: int = maxsize or config.cache.entity_maxsize
+        self.ttl: float = ttl or config.cache.entity_ttl
+
+        self._entities: TTLCache[Hashable, dict[str, Any]] = TTLCache(self.maxsize, self.ttl)
+        self._tombstones: TTLCache[Hashable, _Tombstone] = TTLCache(self.maxsize, self.ttl)
+        self.invalidations: int = 0
+
+    def __set_name__(self, owner: type, name: str) -> None:
+        self.model = owner.sql_model  # type: ignore[attr-defined]
+        self.name: str = f"{owner.__module__}.{owner.__qualname__}"
+        self.table_name: str = self.model.__table__.name
+        self._column_keys: list[str] = [attribute.key for attribute in inspect(self.model).column_attrs]
+        self._id_adapter: TypeAdapter = TypeAdapter(self.model.id.type.python_type)
+
+        entity_caches.setdefault(self.table_name, []).append(self)
+
+    def get(self, obj_id: Hashable) -> dict[str, Any] | None:
+        """
+        Returns a copy of the cached column values, so the callers can't modify the cached entity.
+        """
+        values = self._entities.get(obj_id)
+
+        return copy.deepcopy(values) if values is not None else None
+
+    def put(self, obj: Any) -> None:
+        """
+        Caches the entity, unless it's older than the last known write of the entity.
+        """
+        if (tombstone := self._tombstones.peek(obj.id)) is not None:
+            version = get_entity_version(obj)
+
+            if tombstone.version is None or version is None or version < tombstone.version:
+                return
+
+        self._entities.set(obj.id, copy.deepcopy({key: getattr(obj, key) for key in self._column_keys}))
+
+    def invalidate(self, obj_id: Hashable, version: datetime | None = None) -> None:
+        """
+        Drops the entity and leaves a tombstone, so the versions older than `version` can't be cached anymore.
+        If `version` is None, the entity can't be cached until the tombstone expires, e.g. after deletion.
+        """
+        values = self._entities.peek(obj_id)
+        cached_version = (values.get("updated_at") or values.get("created_at")) if values is not None else None
+
+        # The cached entity is newer than the write, e.g. a delayed invalidation from another worker
+        if version is not None and cached_version is not None and cached_version > version:
+            return
+
+        self._entities.pop(obj_id)
+        self._tombstones.set(obj_id, _Tombstone(version=version))
+        self.invalidations += 1
+
+    def coerce_id(self, obj_id: Any) -> Hashable:
+        """
+        Converts the ID received from other workers (JSON) into the python type of the primary key.
+        """
+        return self._id_adapter.validate_python(obj_id)
+
+    def clear(self) -> None:
+        self._entities.clear()
+        self._tombstones.clear()
+
+    def stats(self) -> dict[str, int]:
+        return self._entities.stats() | {"invalidations": self.invalidations}
+
+
+class ResultCache:
+    """
+    Cache of the pages of the list queries. Like in `EntityCache`, ORM objects are stored as dictionaries of
+    column values, so the cache suits the repositories, which don't return relationships from `get_all`.
+
+    :param maxsize: Maximum number of cached pages. Default is `CACHE_RESULT_MAXSIZE` setting.
+    :param ttl: Time-to-live of the cached pages in seconds. Default is `CACHE_RESULT_TTL` setting.
+    """
+
+    def __init__(self, maxsize: int | None = None, ttl: float | None = None):
+        self.maxsize: int = maxsize or config.cache.result_maxsize
+        self.ttl: float = ttl or config.cache.result_ttl
+
+        self._results: TTLCache[Hashable, Any] = TTLCache(self.maxsize, self.ttl)
+
+    def __set_name__(self, owner: type, name: str) -> None:
+        self.model = owner.sql_model  # type: ignore[attr-defined]
+        self.name: str = f"{owner.__module__}.{owner.__qualname__}"
+        self.table_name: str = self.model.__table__.name
+        self.column_keys: list[str] = [attribute.key for attribute in inspect(self.model).column_attrs]
+
+        result_caches[self.name] = self
+
+    def get_key(self, tables: Iterable[str], *parts: Hashable) -> Hashable:
+        """
+        Builds the key of a result, which is valid until any of the tables is written.
+
+        :param tables: Tables the query reads, the table of the model is always included.
+        :param parts: Canonical parameters of the query, e.g. filter values and pagination params.
+        """
+        return (
+            tuple((table, get_table_version(table)) for table in sorted({self.table_name, *tables})),
+            *parts,
+        )
+
+    def get(self, key: Hashable) -> Any | None:
+        value = self._results.get(key)
+
+        return copy.deepcopy(value) if value is not None else None
+
+    def put(self, key: Hashable, value: Any) -> None:
+        self._results.set(key, copy.deepcopy(value))
+
+    def clear(self) -> None:
+        self._results.clear()
+
+    def stats(self) -> dict[str, int]:
+        return self._results.stats()
+
+
+# Registry of the entity caches by the table name, it's used to apply invalidations from other workers
+entity_caches: dict[str, list[EntityCache]] = {}
+
+# Registry of the result caches by the repository name
+result_caches: dict[str, ResultCache] = {}
+
+# Write versions of the tables, see `ResultCache`
+_table_versions: dict[str, int] = {}
+
+# Function which publishes committed invalidations to other workers, see `app.db.notifications`
+_invalidation_publisher: Callable[[list[Invalidation]], None] | None = None
+
+
+def set_invalidation_publisher(publisher: Callable[[list[Invalidation]], None] | None) -> None:
+    global _invalidation_publisher
+
+    _invalidation_publisher = publisher
+
+
+def get_table_version(table_name: str) -> int:
+    return _table_versions.get(table_name, 0)
+
+
+def bump_table_version(table_name: str) -> None:
+    _table_versions[table_name] = _table_versions.get(table_name, 0) + 1
+
+
+def invalidate_entity(table_name: str, obj_id: Any, version: datetime | None = None) -> None:
+    """
+    Invalidates the entity in all caches of the table, and the cached results which read the table.
+    If `obj_id` is None, only the results are invalidated.
+    """
+    bump_table_version(table_name)
+
+    if obj_id is None:
+        return
+
+    for cache in entity_caches.get(table_name, []):
+        cache.invalidate(cache.coerce_id(obj_id), version)
+
+
+def track_invalidation(session: Session, table_name: str, obj_id: Any, version: datetime | None = None) -> None:
+    """
+    Invalidates the entity right away, and remembers the invalidation to repeat and publish it after commit.
+    """
+    invalidate_entity(table_name, obj_id, version)
+
+    session.info.setdefault(PENDING_INVALIDATIONS_KEY, []).append((table_name, obj_id, version))
+
+
+def has_pending_invalidations(session: Session) -> bool:
+    """
+    Flag which shows that the session has uncommitted writes of cached entities.
+    Such sessions must not populate the caches, because they may read their own uncommitted changes.
+    """
+    return bool(session.info.get(PENDING_INVALIDATIONS_KEY))
+
+
+def get_entity_cache_stats() -> dict[str, dict[str, int]]:
+    return {cache.name: cache.stats() for caches in entity_caches.values() for cache in caches}
+
+
+def get_result_cache_stats() -> dict[str, dict[str, int]]:
+    return {name: cache.stats() for name, cache in result_caches.items()}
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_invalidations_on_commit(session: Session) -> None:
+    if not (invalidations := session.info.pop(PENDING_INVALIDATIONS_KEY, None)):
+        return
+
+    for table_name, obj_id, version in invalidations:
+        invalidate_entity(table_name, obj_id, version)
+
+    if _invalidation_publisher is not None:
+        _invalidation_publisher(invalidations)
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _discard_invalidations_on_rollback(session: Session, transaction: SessionTransaction) -> None:
+    # Invalidations of the committed transaction have been already popped by `after_commit`
+    if transaction.parent is None:
+        session.info.pop(PENDING_INVALIDATIONS_KEY, None)
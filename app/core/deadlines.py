@@ -0,0 +1,120 @@
+"""
+Latency budgets (deadlines) of requests and service methods.
+
+A deadline is declared per route with the `RequestDeadline` dependency, or per service method with
+the `with_deadline` decorator:
+    ```python
+    @router.get("/", dependencies=[Depends(RequestDeadline(2.5))])
+    async def get_examples(...): ...
+    ```
+
+The remaining budget is applied to every transaction, which begins within the deadline, as
+`SET LOCAL statement_timeout`, so Postgres cancels the slow query and frees the connection. The coroutine itself
+is cancelled when the deadline passes, which also cancels the running asyncpg query. In both cases
+`RequestTimeoutError` is raised. Nested deadlines can only shorten the budget.
+"""
+
+import asyncio
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from functools import wraps
+from time import monotonic
+from typing import AsyncGenerator, AsyncIterator, Awaitable, Callable, ParamSpec, TypeVar
+
+from sqlalchemy import Connection, event
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm import Session, SessionTransaction
+
+from app.core.enums import PGErrorCodeEnum
+from app.core.exceptions.base_exception import RequestTimeoutError
+
+P = ParamSpec("P")
+T = TypeVar("T")
+
+# Monotonic time of the current deadline
+_deadline: ContextVar[float | None] = ContextVar("deadline", default=None)
+
+
+def get_remaining_time() -> float | None:
+    """
+    Returns the remaining budget in seconds, or None if there is no deadline.
+    """
+    if (deadline_at := _deadline.get()) is None:
+        return None
+
+    return deadline_at - monotonic()
+
+
+@asynccontextmanager
+async def deadline(seconds: float) -> AsyncIterator[None]:
+    """
+    Runs the block within the latency budget.
+
+    :param seconds: Budget of the block. If an outer deadline is earlier, the outer one is kept.
+
+    :raises RequestTimeoutError: If the budget is exceeded.
+    """
+    deadline_at: float = monotonic() + seconds
+
+    if (outer_deadline_at := _deadline.get()) is not None:
+        deadline_at = min(deadline_at, outer_deadline_at)
+
+    token = _deadline.set(deadline_at)
+
+    try:
+        async with asyncio.timeout(deadline_at - monotonic()):
+            yield
+
+    except TimeoutError:
+        raise RequestTimeoutError("The request has exceeded its time limit")
+
+    except DBAPIError as exc:
+        if getattr(exc.orig, "pgcode", None) == PGErrorCodeEnum.QUERY_CANCELED:
+            raise RequestTimeoutError("The query has exceeded the time limit of the request") from exc
+
+        raise
+
+    finally:
+        _deadline.reset(token)
+
+
+def with_deadline(seconds: float) -> Callable[[Callable[P, Awaitable[T]]], Callable[P, Awaitable[T]]]:
+    """
+    Decorator, which runs the coroutine function (e.g. a service method) within the latency budget.
+    """
+
+    def decorator(method: Callable[P, Awaitable[T]]) -> Callable[P, Awaitable[T]]:
+        @wraps(method)
+        async def wrapper(*args: P.args, **kwargs: P.kwargs) -> T:
+            async with deadline(seconds):
+                return await method(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+class RequestDeadline:
+    """
+    Dependency, which runs the endpoint within the latency budget.
+
+    :param seconds: Budget of the request.
+    """
+
+    def __init__(self, seconds: float):
+        self.seconds = seconds
+
+    async def __call__(self) -> AsyncGenerator[None, None]:
+        async with deadline(self.seconds):
+            yield
+
+
+@event.listens_for(Session, "after_begin")
+def _set_statement_timeout(_session: Session, _transaction: SessionTransaction, connection: Connection) -> None:
+    if (remaining_time := get_remaining_time()) is None or connection.dialect.name != "postgresql":
+        return
+
+    if remaining_time <= 0:
+        raise RequestTimeoutError("The request has exceeded its time limit")
+
+    connection.exec_driver_sql(f"SET LOCAL statement_timeout = {max(int(remaining_time * 1000), 1)}")
@@ -4,8 +4,17 @@ __all__ = [
     "PGErrorCodeEnum",
     "CascadesEnum",
     "ORMRelationshipCascadeTechniqueEnum",
+    "ExportFormatEnum",
+    "CountStrategyEnum",
+    "ReplicaRoutingEnum",
+    "SearchBackendEnum",
+    "NestedFilterStrategyEnum",
 ]
 
-from .db import CascadesEnum, ORMRelationshipCascadeTechniqueEnum, PGErrorCodeEnum
+from .db import CascadesEnum, ORMRelationshipCascadeTechniqueEnum, PGErrorCodeEnum, ReplicaRoutingEnum
 from .environment import AppEnvEnum
+from .export import ExportFormatEnum
+from .filters import NestedFilterStrategyEnum
+from .pagination import CountStrategyEnum
+from .search import SearchBackendEnum
 from .tags import ApiTagEnum
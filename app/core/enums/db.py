@@ -13,6 +13,7 @@ class PGErrorCodeEnum(StrEnum):
     NOT_NULL_VIOLATION = "23502"
     CONSTRAINT_VIOLATION = "23514"
     UNIQUE_VIOLATION = "23505"
+    QUERY_CANCELED = "57014"
 
 
 class CascadesEnum(StrEnum):
@@ -69,3 +70,12 @@ class ORMRelationshipCascadeTechniqueEnum(Enum):
     def db_cascade(cls: "ORMRelationshipCascadeTechniqueEnum") -> str:
         # noinspection PyTypeChecker
         return cls.ALL.value
+
+
+class ReplicaRoutingEnum(StrEnum):
+    """
+    Strategies of choosing a read replica for a session
+    """
+
+    ROUND_ROBIN = "round_robin"
+    LEAST_CONNECTIONS = "least_connections"
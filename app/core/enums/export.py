@@ -0,0 +1,8 @@
+from enum import StrEnum
+
+
+class ExportFormatEnum(StrEnum):
+    """Enum for streaming export formats"""
+
+    NDJSON = "ndjson"
+    CSV = "csv"
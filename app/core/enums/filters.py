@@ -0,0 +1,8 @@
+from enum import StrEnum
+
+
+class NestedFilterStrategyEnum(StrEnum):
+    """Enum for strategies of applying nested filters"""
+
+    JOIN = "join"
+    EXISTS = "exists"
@@ -0,0 +1,10 @@
+from enum import StrEnum
+
+
+class CountStrategyEnum(StrEnum):
+    """Enum for strategies of counting the total number of items of a page"""
+
+    EXACT = "exact"
+    NONE = "none"
+    ESTIMATE = "estimate"
+    CACHED = "cached"
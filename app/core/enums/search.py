@@ -0,0 +1,9 @@
+from enum import StrEnum
+
+
+class SearchBackendEnum(StrEnum):
+    """Enum for backends of the text search of filters"""
+
+    ILIKE = "ilike"
+    FULLTEXT = "fulltext"
+    TRIGRAM = "trigram"
@@ -3,3 +3,4 @@ from enum import StrEnum
 
 class ApiTagEnum(StrEnum):
     EXAMPLE = "Example"
+    METRICS = "Metrics"
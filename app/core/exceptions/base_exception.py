@@ -166,14 +166,16 @@ db_error_mapping: dict[PGErrorCodeEnum, Type[BaseError]] = {
     PGErrorCodeEnum.CONSTRAINT_VIOLATION: LogicalConstraintViolationError,
     PGErrorCodeEnum.FOREIGN_KEY_VIOLATION: ForeignKeyError,
     PGErrorCodeEnum.UNIQUE_VIOLATION: ConflictError,
+    PGErrorCodeEnum.QUERY_CANCELED: RequestTimeoutError,
 }
 
 
-def raise_db_error(ex: DBAPIError) -> NoReturn:
+def raise_db_error(ex: DBAPIError, context: str | None = None) -> NoReturn:
     """
     Raises a more specific database error based on the given DBAPIError exception.
 
     :param ex: The DBAPIError exception to be handled.
+    :param context: Optional prefix for the error detail, e.g. the number of the failed batch.
 
     :raise: A more specific error based on the error mapping,
             or re-raises the original error if the "pgcode" is not found in the mapping.
@@ -183,6 +185,7 @@ def raise_db_error(ex: DBAPIError) -> NoReturn:
         exception_message: tuple[str, ...] = ex.orig.args  # type: ignore[union-attr]
 
         errors = [
+            context,
             error_class.default_detail,
             f"Error: {', '.join(exception_message)}"
             if exception_message and config.environment != AppEnvEnum.PRODUCTION
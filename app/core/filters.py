@@ -1,14 +1,72 @@
-from datetime import date, datetime
-from typing import Any, cast
+from dataclasses import dataclass
+from dataclasses import field as dataclass_field
+from datetime import date
+from typing import Any, Callable, ClassVar, get_args
 
+import orjson
 from fastapi_filter.contrib.sqlalchemy import Filter
 from fastapi_filter.contrib.sqlalchemy.filter import _orm_operator_transformer
-from pydantic import field_validator, model_validator
-from sqlalchemy import BinaryExpression, Column, Select, func, or_
-from sqlalchemy.orm import DeclarativeBase, Query
+from pydantic import ValidationInfo, field_validator, model_validator
+from sqlalchemy import BinaryExpression, Column, ColumnElement, Select, func, or_, select
+from sqlalchemy import inspect as sa_inspect
+from sqlalchemy.orm import DeclarativeBase, InstrumentedAttribute, Query
 
 from app.core.constants import COMPOUND_SEARCH_FIELD_NAME
-from app.core.helpers import get_columns_for_model, is_join_present
+from app.core.enums import NestedFilterStrategyEnum, SearchBackendEnum
+from app.core.helpers import get_columns_for_model, is_entity_joined
+from app.core.predicates import (
+    DAY_OPERATORS,
+    PREFIX_OPERATORS,
+    day_predicate,
+    is_day,
+    like_predicate,
+    prefix_predicate,
+    range_predicate,
+)
+
+# Operators of `fastapi-filter` extended with the prefix search, which is translated by `prefix_predicate`
+OPERATOR_TRANSFORMERS: dict[str, Callable[[Any], tuple[str, Any]]] = _orm_operator_transformer | {
+    operator: (lambda value, operator=operator: (operator, value)) for operator in PREFIX_OPERATORS
+}
+
+
+def _canonicalize(values: dict[str, Any]) -> dict[str, Any]:
+    canonical: dict[str, Any] = {}
+
+    for key, value in values.items():
+        if isinstance(value, dict):
+            value = _canonicalize(value)
+        elif isinstance(value, list) and key.endswith(("__in", "__not_in")):
+            value = sorted(value, key=str)
+
+        canonical[key] = value
+
+    return canonical
+
+
+@dataclass(slots=True)
+class FilterMetadata:
+    """
+    Everything a filter needs from its model, which is resolved once per filter class.
+
+    `operators` maps the filter field names to the model columns and the `fastapi-filter` operator transformers,
+    e.g. `name__in` -> (`Model.name`, transformer of `in`). The transformer is None for plain equality.
+
+    `nested_filters` is the join graph of the filter: the fields of the nested filters and their filter classes.
+    The relationships leading to the nested models are resolved on the first use and kept in `relations`,
+    because the mappers may be not configured yet when the filter class is defined.
+    """
+
+    column_names: frozenset[str] = frozenset()
+    range_column: InstrumentedAttribute | None = None
+    multi_search_columns: list[InstrumentedAttribute] = dataclass_field(default_factory=list)
+    search_model_columns: list[InstrumentedAttribute] = dataclass_field(default_factory=list)
+    search_vector_column: InstrumentedAttribute | None = None
+    allowed_order_by_fields: frozenset[str] = frozenset()
+    disallowed_order_by_fields: frozenset[str] = frozenset()
+    operators: dict[str, tuple[InstrumentedAttribute, Callable | None]] = dataclass_field(default_factory=dict)
+    nested_filters: dict[str, type["BaseFilter"]] = dataclass_field(default_factory=dict)
+    relations: dict[str, InstrumentedAttribute | None] = dataclass_field(default_factory=dict)
 
 
 class BaseFilter(Filter, extra="allow"):  # type: ignore
@@ -29,6 +87,44 @@ class BaseFilter(Filter, extra="allow"):  # type: ignore
         class Constants(BaseFilter.Constants):
             disallowed_order_by_fields = ["field1", "field2"]
         ```
+
+    The `search` and `search_model_fields` searches use `ILIKE '%value%'` by default, which can't use a B-tree index.
+    To make the search index-backed, set the search backend:
+        ```python
+        class Constants(BaseFilter.Constants):
+            # `websearch_to_tsquery` against a generated `tsvector` column with a GIN index,
+            # see `add_search_vector_column` and `create_search_vector_index` migration helpers
+            search_backend = SearchBackendEnum.FULLTEXT
+            search_vector_field = "search_vector"
+
+            # or `pg_trgm` similarity of the search fields with GIN trigram indexes, see `create_trigram_index`
+            search_backend = SearchBackendEnum.TRIGRAM
+        ```
+    Both backends order the results by relevance, unless the client requests an explicit ordering.
+
+    Prefix searches are index-backed, unlike `like`/`ilike` with a leading wildcard:
+        ```python
+        # `lower(name) LIKE 'abc%'`, see `create_prefix_index` migration helper
+        name__istartswith: str | None = None
+        # `name LIKE 'abc%'`
+        name__startswith: str | None = None
+        ```
+
+    Nested filters are joined to the query by default. Joins on one-to-many relationships multiply the rows,
+    so the results need `is_unique=True` and the totals of the pages are off. To filter by the EXISTS semi-joins
+    over the relationships instead, set the strategy:
+        ```python
+        class Constants(BaseFilter.Constants):
+            nested_filter_strategy = NestedFilterStrategyEnum.EXISTS
+        ```
+
+    `Constants` are checked against the model once, when the filter class is defined, so a misconfigured filter
+    fails on import rather than on request.
+
+    All children must declare this field, if they want to allow sparse fieldsets (`?fields=id,name`):
+        ```python
+        fields: list[str] | None = None
+        ```
     """
 
     class Constants(Filter.Constants):
@@ -38,43 +134,98 @@ class BaseFilter(Filter, extra="allow"):  # type: ignore
         multi_search_fields: list[str] | None = None
         date_range_fields: list[str] | None = None
         range_field: str | None = None
+        fields_field_name: str = "fields"
+        search_backend: SearchBackendEnum = SearchBackendEnum.ILIKE
+        search_vector_field: str = "search_vector"
+        search_config: str = "simple"
+        nested_filter_strategy: NestedFilterStrategyEnum = NestedFilterStrategyEnum.JOIN
+
+    @property
+    def filtering_fields(self):
+        fields = self.model_dump(exclude_none=True, exclude_unset=True)
+        fields.pop(self.Constants.ordering_field_name, None)
+        fields.pop(self.Constants.fields_field_name, None)
+        return fields.items()
+
+    @property
+    def selected_fields(self) -> list[str] | None:
+        """
+        Columns requested through the sparse fieldset. The `id` and the ordering columns are always included,
+        because they are required for the pagination.
 
-    @model_validator(mode="before")
-    def check_date_range_fields(cls, values: dict) -> dict:
-        if not (date_range_fields := getattr(cls.Constants, "date_range_fields", [])):
-            return values
+        :return: List of column names, or None if all columns are requested.
+        """
+        if not (fields := getattr(self, self.Constants.fields_field_name, None)):
+            return None
 
-        db_model: type[DeclarativeBase] = cast(type[DeclarativeBase], cls.Constants.model)
+        ordering_values: list[str] = getattr(self, self.Constants.ordering_field_name, None) or []
+        ordering_fields: list[str] = [name.replace("-", "").replace("+", "") for name in ordering_values]
 
-        if not cls.Constants.range_field:
-            raise ValueError("You can't use `date_range_fields` without setting `range_field`.")
+        return list(dict.fromkeys(["id", *fields, *ordering_fields]))
 
-        if cls.Constants.range_field not in get_columns_for_model(db_model):
-            raise ValueError(
-                f"You can't use date range fields without the corresponding `{cls.Constants.range_field}` in DB table."
-            )
+    def get_canonical_values(self) -> bytes:
+        """
+        Canonical form of the filter values, e.g. for the keys of the cached results. Equivalent filters produce
+        the same value: the defaults are stripped, the keys and the values of `in`/`not_in` filters are sorted.
+        """
+        return orjson.dumps(
+            _canonicalize(self.model_dump(exclude_defaults=True, exclude_none=True)),
+            default=str,
+            option=orjson.OPT_SORT_KEYS,
+        )
 
-        for field in date_range_fields:
-            if field not in cls.model_fields:
-                raise ValueError(
-                    f"The field '{field}' specified in 'Constant.date_range_fields' "
-                    "must be present in 'FilterModel' fields."
-                )
+    def get_tables(self) -> set[str]:
+        """
+        Tables the filtered query reads: the table of the model and the tables of the applied nested filters.
+        """
+        tables: set[str] = {self.Constants.model.__table__.name}
 
-        date_from_field, date_to_field = date_range_fields
-        value_from, value_to = values.get(date_from_field), values.get(date_to_field)
+        for field_name in self.filter_metadata.nested_filters:
+            if isinstance(nested_filter := getattr(self, field_name, None), BaseFilter):
+                tables |= nested_filter.get_tables()
 
-        if value_from and value_to and value_from > value_to:
-            raise ValueError(f"`{date_from_field}` can't be bigger than `{date_to_field}`.")
+        return tables
 
-        return values
+    # Resolved once per filter class, see `__pydantic_init_subclass__`
+    filter_metadata: ClassVar[FilterMetadata] = FilterMetadata()
 
-    @model_validator(mode="before")
-    def check_multi_search_fields_existence(cls, values: dict) -> dict:
-        multi_search_fields: list[str] = getattr(cls.Constants, "multi_search_fields", []) or []
+    @classmethod
+    def __pydantic_init_subclass__(cls, **kwargs: Any) -> None:
+        """
+        Checks the `Constants` against the model and the filter fields, and resolves the model columns once,
+        when the filter class is defined, so the validation and `filter()` only deal with the values.
+        """
+        super().__pydantic_init_subclass__(**kwargs)
 
-        if not multi_search_fields and COMPOUND_SEARCH_FIELD_NAME not in cls.model_fields:
-            return values
+        # Intermediate base filters don't have a model
+        if (db_model := getattr(cls.Constants, "model", None)) is None:
+            return
+
+        cls.check_constants(db_model)
+        cls.filter_metadata = cls.build_filter_metadata(db_model)
+
+    @classmethod
+    def check_constants(cls, db_model: type[DeclarativeBase]) -> None:
+        column_names: list[str] = get_columns_for_model(db_model)
+
+        if date_range_fields := cls.Constants.date_range_fields:
+            if not cls.Constants.range_field:
+                raise ValueError("You can't use `date_range_fields` without setting `range_field`.")
+
+            if cls.Constants.range_field not in column_names:
+                raise ValueError(
+                    "You can't use date range fields without the corresponding "
+                    f"`{cls.Constants.range_field}` in DB table."
+                )
+
+            for field_name in date_range_fields:
+                if field_name not in cls.model_fields:
+                    raise ValueError(
+                        f"The field '{field_name}' specified in 'Constant.date_range_fields' "
+                        "must be present in 'FilterModel' fields."
+                    )
+
+        multi_search_fields: list[str] = cls.Constants.multi_search_fields or []
 
         if not multi_search_fields and COMPOUND_SEARCH_FIELD_NAME in cls.model_fields:
             raise ValueError(
@@ -87,37 +238,126 @@ class BaseFilter(Filter, extra="allow"):  # type: ignore
                 f"Field '{COMPOUND_SEARCH_FIELD_NAME}' must be present in the model fields to use multi search."
             )
 
-        db_model: type[DeclarativeBase] = cast(type[DeclarativeBase], cls.Constants.model)
+        if any(field_name not in column_names for field_name in multi_search_fields):
+            raise ValueError("You can't use values which are not presented in DB Model!")
 
-        for field in multi_search_fields:
-            if field not in get_columns_for_model(db_model):
-                raise ValueError("You can't use values which are not presented in DB Model!")
-
-        return values
-
-    @model_validator(mode="before")
-    def check_allowed_and_disallowed(cls, values: dict) -> dict:
-        allowed = values.get("allowed_order_by_fields", [])
-        disallowed = values.get("disallowed_order_by_fields", [])
-
-        if allowed and disallowed:
+        if cls.Constants.allowed_order_by_fields and cls.Constants.disallowed_order_by_fields:
             raise ValueError(
                 "You cannot use both 'allowed_order_by_fields' and 'disallowed_order_by_fields' at the same time."
             )
 
-        return values
-
-    @model_validator(mode="before")
-    def add_fields_to_search(cls, values: dict) -> dict:
-        fields_to_search: set[str] = set(getattr(cls.Constants, "fields_for_insensitive_search", []) or set())
+        if (
+            cls.Constants.search_backend == SearchBackendEnum.FULLTEXT
+            and cls.Constants.search_vector_field not in column_names
+        ):
+            raise ValueError(
+                f"You can't use the full-text search without the `{cls.Constants.search_vector_field}` "
+                "tsvector column in DB table."
+            )
 
-        for value in fields_to_search:
-            if value not in cls.model_fields:
+        for field_name in cls.Constants.fields_for_insensitive_search or []:
+            if field_name not in cls.model_fields:
                 raise ValueError(
                     "You can't use values which are not presented in FilterModel "
                     "fields in `fields_for_insensitive_search`."
                 )
 
+    @classmethod
+    def build_filter_metadata(cls, db_model: type[DeclarativeBase]) -> FilterMetadata:
+        operators: dict[str, tuple[InstrumentedAttribute, Callable | None]] = {}
+
+        for field_name in cls.model_fields:
+            column_name, _, operator = field_name.partition("__")
+
+            if operator and operator not in OPERATOR_TRANSFORMERS:
+                continue
+
+            if isinstance(column := getattr(db_model, column_name, None), InstrumentedAttribute):
+                operators[field_name] = (column, OPERATOR_TRANSFORMERS[operator] if operator else None)
+
+        nested_filters: dict[str, type[BaseFilter]] = {}
+
+        for field_name, field_info in cls.model_fields.items():
+            # Nested filters are usually optional, i.e. annotated as `NestedFilter | None`
+            for annotation in (field_info.annotation, *get_args(field_info.annotation)):
+                if isinstance(annotation, type) and issubclass(annotation, BaseFilter):
+                    nested_filters[field_name] = annotation
+                    break
+
+        return FilterMetadata(
+            column_names=frozenset(get_columns_for_model(db_model)),
+            range_column=getattr(db_model, cls.Constants.range_field) if cls.Constants.date_range_fields else None,
+            multi_search_columns=[getattr(db_model, name) for name in cls.Constants.multi_search_fields or []],
+            search_model_columns=[
+                getattr(db_model, name) for name in getattr(cls.Constants, "search_model_fields", None) or []
+            ],
+            search_vector_column=(
+                getattr(db_model, cls.Constants.search_vector_field)
+                if cls.Constants.search_backend == SearchBackendEnum.FULLTEXT
+                else None
+            ),
+            allowed_order_by_fields=frozenset(cls.Constants.allowed_order_by_fields or []),
+            disallowed_order_by_fields=frozenset(cls.Constants.disallowed_order_by_fields or []),
+            operators=operators,
+            nested_filters=nested_filters,
+        )
+
+    @classmethod
+    def get_relation(cls, field_name: str, nested_model: type[DeclarativeBase]) -> InstrumentedAttribute | None:
+        """
+        Returns the relationship of the filter model, which leads to the model of the nested filter.
+        The relationship named after the field is preferred, if the nested model is related several times.
+
+        :return: Relationship attribute, or None if there is no unambiguous relationship.
+        """
+        if field_name in cls.filter_metadata.relations:
+            return cls.filter_metadata.relations[field_name]
+
+        db_model: type[DeclarativeBase] = cls.Constants.model
+        candidates = [
+            relationship.key
+            for relationship in sa_inspect(db_model).relationships
+            if relationship.mapper.class_ is nested_model
+        ]
+
+        if field_name in candidates or len(candidates) == 1:
+            relation = getattr(db_model, field_name if field_name in candidates else candidates[0])
+        else:
+            relation = None
+
+        cls.filter_metadata.relations[field_name] = relation
+
+        return relation
+
+    @field_validator("*", mode="before", check_fields=False)
+    def validate_selected_fields(cls, value: Any, field: ValidationInfo) -> Any:
+        if field.field_name != cls.Constants.fields_field_name or value is None:
+            return value
+
+        fields: list[str] = [name.strip() for name in value.split(",")] if isinstance(value, str) else value
+        fields = [name for name in fields if name]
+
+        if unknown_fields := set(fields) - cls.filter_metadata.column_names:
+            raise ValueError(f"You can't select unknown fields: {', '.join(sorted(unknown_fields))}.")
+
+        return fields or None
+
+    @model_validator(mode="before")
+    def check_date_range_fields(cls, values: dict) -> dict:
+        if not (date_range_fields := cls.Constants.date_range_fields):
+            return values
+
+        date_from_field, date_to_field = date_range_fields
+        value_from, value_to = values.get(date_from_field), values.get(date_to_field)
+
+        if value_from and value_to and value_from > value_to:
+            raise ValueError(f"`{date_from_field}` can't be bigger than `{date_to_field}`.")
+
+        return values
+
+    @model_validator(mode="before")
+    def add_fields_to_search(cls, values: dict) -> dict:
+        for value in cls.Constants.fields_for_insensitive_search or []:
             if not values.get(f"{value}__ilike"):
                 values[f"{value}__ilike"] = values.pop(value, None)
 
@@ -145,8 +385,8 @@ class BaseFilter(Filter, extra="allow"):  # type: ignore
         if field_names is None:
             return None
 
-        allowed = set(getattr(cls.Constants, "allowed_order_by_fields", []) or [])
-        disallowed = set(getattr(cls.Constants, "disallowed_order_by_fields", []) or [])
+        allowed = cls.filter_metadata.allowed_order_by_fields
+        disallowed = cls.filter_metadata.disallowed_order_by_fields
 
         cleaned_field_names = {name.replace("+", "").replace("-", "") for name in field_names}
 
@@ -161,13 +401,20 @@ class BaseFilter(Filter, extra="allow"):  # type: ignore
 
         return field_names
 
-    def filter(self, query: Query | Select, autojoin: bool = True):
+    def filter(
+        self,
+        query: Query | Select,
+        autojoin: bool = True,
+        *,
+        nested_filter_strategy: NestedFilterStrategyEnum | None = None,
+    ):
         """
         NOTE: The most part of the code is copied from the original implementation.
         The difference is as follows:
             - implementation of date range filter.
             - implementation of nested filter logic.
-            - ability to filter by date (if `datetime` annotation).
+            - ability to filter by date (if `datetime` annotation), the day is compared as a range of timestamps.
+            - sargable predicates for the date ranges and the prefix searches, see `app.core.predicates`.
             - implementation of compound search logic.
 
         That's why, be careful when updating current implementation.
@@ -175,18 +422,22 @@ class BaseFilter(Filter, extra="allow"):  # type: ignore
         :param query: Query object or actual SQL query.
         :param autojoin: Flag which specifies if we need to do implicit join, pass False if you have a complex query
                          with joins on your side.
+        :param nested_filter_strategy: How to apply the nested filters, `Constants.nested_filter_strategy` by default.
 
         :return: Implicitly modified query object which we executed in the caller function.
         """
+        strategy: NestedFilterStrategyEnum = nested_filter_strategy or self.Constants.nested_filter_strategy
+
         if (range_fields := self.Constants.date_range_fields) and self.filtering_fields:
             date_from_field, date_to_field = range_fields
 
-            date_from: datetime = getattr(self, date_from_field) or datetime.min
-            date_to: datetime = getattr(self, date_to_field) or datetime.max
-
-            query: Select = query.where(
-                getattr(self.Constants.model, self.Constants.range_field).between(date_from, date_to)
-            )
+            # The missing bound is skipped, so the index on the range column is scanned from one side only
+            if (
+                range_condition := range_predicate(
+                    self.filter_metadata.range_column, getattr(self, date_from_field), getattr(self, date_to_field)
+                )
+            ) is not None:
+                query: Select = query.where(range_condition)
 
         # We get rid of range fields, because we've been already construct the query above
         filtering_fields_without_range_fields: list[tuple[str, Any]] = [
@@ -197,43 +448,132 @@ class BaseFilter(Filter, extra="allow"):  # type: ignore
             field_value: BaseFilter | str = getattr(self, field_name)
 
             if isinstance(field_value, BaseFilter):
-                # If the field is a nested filter, we need to join the model and apply the filter.
-                # In original implementation, `fastapi-filter` utilized the cartesian product of the tables, i.e.
-                # >>> FROM root_table, nested_table
-                # That's why previous realisation returns irrelevant final results.
-                if autojoin and not is_join_present(query, field_value.Constants.model):  # type: ignore
-                    query: Select = query.join(field_value.Constants.model)
-
-                query: Select = field_value.filter(query, autojoin=autojoin)
+                query: Select = self._apply_nested_filter(query, field_name, field_value, autojoin, strategy)
 
             elif field_name == COMPOUND_SEARCH_FIELD_NAME:
                 # If the field is a compound search field, we need to apply the filter to all the fields.
-                search_filters: list[BinaryExpression] = [
-                    getattr(self.Constants.model, field).ilike(f"%{value}%")
-                    for field in self.Constants.multi_search_fields or []
-                ]
+                query: Select = self._apply_search(query, self.filter_metadata.multi_search_columns, value)
 
-                query: Select = query.filter(or_(*search_filters))
+            elif isinstance(field_value, date) and (operator := field_name.partition("__")[2] or None) is None:
+                # Filter by date is a range of the day, casting the column into date would prevent the index usage.
+                day: date = field_value if is_day(field_value) else field_value.date()  # type: ignore
+                query: Select = query.filter(day_predicate(self._get_column(field_name), day))
 
-            elif isinstance(field_value, date):
-                # In order to filter by date we need to cast the `datetime` field into date.
-                query: Select = query.filter(func.date(getattr(self.Constants.model, field_name)) == field_value)
+            elif is_day(field_value) and operator in DAY_OPERATORS:
+                query: Select = query.filter(day_predicate(self._get_column(field_name), field_value, operator))
+
+            elif field_name == self.Constants.search_field_name and hasattr(self.Constants, "search_model_fields"):
+                query: Select = self._apply_search(query, self.filter_metadata.search_model_columns, value)
 
             else:
-                if "__" in field_name:
-                    field_name, operator = field_name.split("__")
-                    operator, value = _orm_operator_transformer[operator](value)
-                else:
-                    operator: str = "__eq__"
-
-                if field_name == self.Constants.search_field_name and hasattr(self.Constants, "search_model_fields"):
-                    search_filters: list[BinaryExpression] = [
-                        getattr(self.Constants.model, field).ilike(f"%{value}%")
-                        for field in self.Constants.search_model_fields
-                    ]
-                    query: Select = query.filter(or_(*search_filters))
+                model_field, transformer = self.filter_metadata.operators.get(field_name) or self._get_operator(
+                    field_name
+                )
+
+                if transformer is not None:
+                    operator, value = transformer(value)
+
+                    if operator in PREFIX_OPERATORS:
+                        query: Select = query.filter(prefix_predicate(model_field, operator, value))
+                    elif operator in ("like", "ilike"):
+                        query: Select = query.filter(like_predicate(model_field, operator, value))
+                    else:
+                        query: Select = query.filter(getattr(model_field, operator)(value))
                 else:
-                    model_field: Column = getattr(self.Constants.model, field_name)
-                    query: Select = query.filter(getattr(model_field, operator)(value))
+                    query: Select = query.filter(model_field == value)
 
         return query
+
+    def _apply_nested_filter(
+        self,
+        query: Select,
+        field_name: str,
+        nested_filter: "BaseFilter",
+        autojoin: bool,
+        strategy: NestedFilterStrategyEnum,
+    ) -> Select:
+        nested_model: type[DeclarativeBase] = nested_filter.Constants.model
+        relation = self.get_relation(field_name, nested_model)
+
+        if strategy == NestedFilterStrategyEnum.EXISTS:
+            if relation is None:
+                raise ValueError(
+                    f"Can't filter by '{field_name}' with EXISTS: '{self.Constants.model.__name__}' has no "
+                    f"unambiguous relationship to '{nested_model.__name__}'."
+                )
+
+            # The nested filter (and its own nested filters) only produce the criteria of the subquery,
+            # so the rows of the root model are never multiplied.
+            criteria = nested_filter.filter(
+                select(nested_model), autojoin=autojoin, nested_filter_strategy=strategy
+            ).whereclause
+
+            # `any()` for one-to-many and many-to-many, `has()` for many-to-one relationships
+            exists = relation.any if relation.property.uselist else relation.has
+
+            return query.where(exists(criteria) if criteria is not None else exists())
+
+        # If the field is a nested filter, we need to join the model and apply the filter.
+        # In original implementation, `fastapi-filter` utilized the cartesian product of the tables, i.e.
+        # >>> FROM root_table, nested_table
+        # That's why previous realisation returns irrelevant final results.
+        if autojoin and not is_entity_joined(query, nested_model):
+            query: Select = query.join(relation if relation is not None else nested_model)
+
+        return nested_filter.filter(query, autojoin=autojoin)
+
+    def get_search_criteria(
+        self, columns: list[InstrumentedAttribute], value: str
+    ) -> tuple[ColumnElement[bool], ColumnElement | None]:
+        """
+        Builds the search predicate of the configured search backend.
+
+        :param columns: Columns to search in. The full-text backend searches the tsvector column instead,
+                        which is expected to be generated from the same columns.
+        :param value: Search term as it was sent by the client.
+
+        :return: Predicate and the relevance expression, which is None for the ILIKE backend.
+        """
+        match self.Constants.search_backend:
+            case SearchBackendEnum.FULLTEXT:
+                # Unlike `to_tsquery`, `websearch_to_tsquery` never fails on the user input
+                ts_query = func.websearch_to_tsquery(self.Constants.search_config, value)
+                search_vector: InstrumentedAttribute = self.filter_metadata.search_vector_column  # type: ignore
+
+                return search_vector.op("@@")(ts_query), func.ts_rank_cd(search_vector, ts_query)
+
+            case SearchBackendEnum.TRIGRAM:
+                # `%` is the similarity operator of `pg_trgm`, which is supported by the GIN trigram indexes
+                search_filters: list[BinaryExpression] = [column.op("%")(value) for column in columns]
+                rank = func.greatest(*[func.similarity(column, value) for column in columns])
+
+                return or_(*search_filters), rank
+
+            case _:
+                search_filters: list[BinaryExpression] = [column.ilike(f"%{value}%") for column in columns]
+
+                return or_(*search_filters), None
+
+    def _apply_search(self, query: Select, columns: list[InstrumentedAttribute], value: str) -> Select:
+        criteria, rank = self.get_search_criteria(columns, value)
+        query: Select = query.filter(criteria)
+
+        # The relevance ordering is applied only if the client didn't ask for an ordering
+        if rank is not None and not getattr(self, self.Constants.ordering_field_name, None):
+            query: Select = query.order_by(rank.desc())
+
+        return query
+
+    def _get_column(self, field_name: str) -> InstrumentedAttribute:
+        if (resolved := self.filter_metadata.operators.get(field_name)) is not None:
+            return resolved[0]
+
+        return getattr(self.Constants.model, field_name)
+
+    def _get_operator(self, field_name: str) -> tuple[Column, Callable | None]:
+        """
+        Fallback for the fields, which couldn't be resolved when the class was defined.
+        """
+        column_name, _, operator = field_name.partition("__")
+
+        return getattr(self.Constants.model, column_name), OPERATOR_TRANSFORMERS[operator] if operator else None
@@ -1,7 +1,15 @@
 __all__ = [
     "pascal_to_snake",
     "is_join_present",
+    "is_entity_joined",
     "get_columns_for_model",
+    "get_search_vector_expression",
 ]
 
-from .database import get_columns_for_model, is_join_present, pascal_to_snake
+from .database import (
+    get_columns_for_model,
+    get_search_vector_expression,
+    is_entity_joined,
+    is_join_present,
+    pascal_to_snake,
+)
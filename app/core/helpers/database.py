@@ -1,7 +1,8 @@
 import re
+from typing import Any
 
-from sqlalchemy import Join, Select, Table
-from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy import FromClause, Join, Select, Table, inspect
+from sqlalchemy.orm import DeclarativeBase, InstrumentedAttribute, Mapper, RelationshipProperty
 
 
 def pascal_to_snake(pascal_string: str) -> str:
@@ -75,3 +76,64 @@ def get_columns_for_model(model: type[DeclarativeBase]) -> list[str]:
     :return: A list of column names for the specified model.
     """
     return model.__table__.columns.keys()
+
+
+def get_search_vector_expression(columns: list[str], config: str = "simple") -> str:
+    """
+    Builds the SQL expression of a generated `tsvector` column for the full-text search of filters.
+
+    The columns are weighted by their position (A, B, C, then D for the rest), so the matches in the first columns
+    are ranked higher by `ts_rank_cd`. The same expression should be used in the `Computed` of the model column
+    and in the migration (see `add_search_vector_column`).
+
+    :param: columns (list[str]): Text columns to search in, in the order of their importance.
+
+    :param: config (str): Text search configuration, e.g. 'simple' or 'english'.
+
+    :return: SQL expression, e.g. "setweight(to_tsvector('simple', coalesce(name, '')), 'A')".
+    """
+    weights: str = "ABCD"
+
+    return " || ".join(
+        f"setweight(to_tsvector('{config}', coalesce({column}, '')), '{weights[min(index, len(weights) - 1)]}')"
+        for index, column in enumerate(columns)
+    )
+
+
+def is_entity_joined(select_statement: Select, entity: type[DeclarativeBase]) -> bool:
+    """
+    Checks if the entity is joined by `Select.join()`, without computing the FROM list of the statement.
+    Explicit joins passed to `Select.select_from()` are checked with `is_join_present`.
+
+    :param: select_statement (Select): The SQLAlchemy Select object to be inspected.
+
+    :param: entity (type[DeclarativeBase]): Joined model class.
+
+    :return: True if the entity is a target of a join in the statement, otherwise False.
+    """
+    for target, *_ in select_statement._setup_joins:
+        if _get_join_target_table(target) is entity.__table__:
+            return True
+
+    if any(isinstance(from_clause, Join) for from_clause in select_statement._from_obj):
+        return is_join_present(select_statement, entity)
+
+    return False
+
+
+def _get_join_target_table(target: Any) -> Any:
+    """
+    Resolves the target of `Select.join()` into the table of the joined entity. The target is either the entity,
+    its (annotated) table or a relationship attribute leading to the entity. Aliases aren't resolved, because
+    the columns of the entity itself aren't selected from them.
+    """
+    if isinstance(target, InstrumentedAttribute) and isinstance(target.property, RelationshipProperty):
+        target = target.property.entity
+
+    if isinstance(target, FromClause):
+        return target._deannotate()
+
+    if isinstance(mapper := inspect(target, raiseerr=False), Mapper):
+        return mapper.local_table
+
+    return None
@@ -0,0 +1,110 @@
+"""
+Request-scoped batching loaders.
+
+`EntityLoader` works like a DataLoader: every `load()` call made within the same event-loop tick is queued and
+resolved by a single batched query, afterward the results are cached for the lifetime of the loader.
+
+Loaders are bound to the database session, which is request-scoped (see `get_db_session`), so the cache never
+outlives the request. Use `asyncio.gather` to resolve several entities concurrently, sequential awaits are served
+from the cache only.
+"""
+
+import asyncio
+from typing import Awaitable, Callable, Generic, Hashable, Sequence
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.core.types import Model
+
+ENTITY_LOADERS_KEY: str = "entity_loaders"
+
+
+class EntityLoader(Generic[Model]):
+    """
+    Coalesces single entity lookups into batched queries and caches the results.
+
+    :param batch_load_fn: Coroutine function which loads entities by a list of IDs.
+                          The order of the returned entities doesn't matter.
+    """
+
+    def __init__(self, batch_load_fn: Callable[[list[Hashable]], Awaitable[Sequence[Model]]]):
+        self.batch_load_fn = batch_load_fn
+        self._cache: dict[Hashable, asyncio.Future[Model | None]] = {}
+        self._queue: list[tuple[Hashable, asyncio.Future[Model | None]]] = []
+        # Keep strong references to the running batches, otherwise they may be garbage collected
+        self._tasks: set[asyncio.Task] = set()
+
+    def load(self, obj_id: Hashable) -> asyncio.Future[Model | None]:
+        """
+        Returns a future with the entity, or None if the entity doesn't exist.
+        """
+        if (future := self._cache.get(obj_id)) is not None:
+            return future
+
+        loop = asyncio.get_running_loop()
+        future = self._cache[obj_id] = loop.create_future()
+
+        if not self._queue:
+            loop.call_soon(self._dispatch)
+
+        self._queue.append((obj_id, future))
+
+        return future
+
+    async def load_many(self, obj_ids: Sequence[Hashable]) -> list[Model | None]:
+        return await asyncio.gather(*[self.load(obj_id) for obj_id in obj_ids])
+
+    def prime(self, obj_id: Hashable, obj: Model) -> None:
+        """
+        Puts an already loaded entity into the cache, e.g. after it was created or updated.
+        """
+        future: asyncio.Future[Model | None] = asyncio.get_running_loop().create_future()
+        future.set_result(obj)
+
+        self._cache[obj_id] = future
+
+    def clear(self, obj_id: Hashable | None = None) -> None:
+        """
+        Removes the entity from the cache, or the whole cache if `obj_id` is not provided.
+        """
+        if obj_id is None:
+            self._cache.clear()
+        else:
+            self._cache.pop(obj_id, None)
+
+    def _dispatch(self) -> None:
+        batch, self._queue = self._queue, []
+
+        task = asyncio.get_running_loop().create_task(self._load_batch(batch))
+
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _load_batch(self, batch: list[tuple[Hashable, asyncio.Future[Model | None]]]) -> None:
+        try:
+            objs: list[Model] = await self.batch_load_fn([obj_id for obj_id, _ in batch])  # type: ignore[assignment]
+
+        except Exception as exc:
+            for obj_id, future in batch:
+                self._cache.pop(obj_id, None)
+
+                if not future.done():
+                    future.set_exception(exc)
+
+            return
+
+        objs_by_id: dict[Hashable, Model] = {obj.id: obj for obj in objs}  # type: ignore[attr-defined]
+
+        for obj_id, future in batch:
+            if not future.done():
+                future.set_result(objs_by_id.get(obj_id))
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _clear_loaders_on_rollback(session: Session, _) -> None:
+    """
+    Rollback expires the loaded instances, so they must not be served from the loaders cache anymore.
+    """
+    for loader in session.info.get(ENTITY_LOADERS_KEY, {}).values():
+        loader.clear()
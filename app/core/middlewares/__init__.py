@@ -4,6 +4,7 @@ from fastapi.middleware.cors import CORSMiddleware
 from app.config import config
 
 from .error_middleware import ErrorMiddleware
+from .query_accounting_middleware import QueryAccountingMiddleware
 
 
 def init_middlewares(app: FastAPI) -> FastAPI:
@@ -16,7 +17,13 @@ def init_middlewares(app: FastAPI) -> FastAPI:
 
     To ensure that all unprocessed errors are caught and that other middleware logic is applied correctly,
     the ErrorMiddleware should be added last.
+
+    QueryAccountingMiddleware is wrapped by the ErrorMiddleware, so the exceeded query budget, which is raised
+    in the test environment, is handled as any other error.
     """
+    if config.query.accounting_enabled:
+        app.add_middleware(QueryAccountingMiddleware)
+
     app.add_middleware(ErrorMiddleware)
     app.add_middleware(
         CORSMiddleware,
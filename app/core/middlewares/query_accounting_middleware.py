@@ -0,0 +1,27 @@
+from typing import Callable
+
+from fastapi import Request, Response
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from app.db.query_accounting import check_query_budget, track_queries
+
+
+class QueryAccountingMiddleware(BaseHTTPMiddleware):
+    """
+    Middleware to count the statements, rows and DB time of every request.
+
+    The totals are sent in the `Server-Timing` header, so they are visible in the browser dev tools.
+    Requests, which exceed the query budget or repeat the same statement too many times, are reported
+    (see `check_query_budget`).
+    """
+
+    async def dispatch(self, request: Request, call_next: Callable) -> Response:
+        with track_queries() as stats:
+            response: Response = await call_next(request)
+
+        response.headers["Server-Timing"] = (
+            f'db;dur={stats.duration * 1000:.2f};desc="{stats.statements} statements, {stats.rows} rows"'
+        )
+        check_query_budget(stats, url=request.url.path, method=request.method)
+
+        return response
@@ -1,8 +1,460 @@
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Generic, Sequence, TypeVar
+
+import orjson
 from fastapi import Query
 from fastapi_pagination import Page as FastAPIPaginationPage
+from fastapi_pagination import Params as FastAPIPaginationParams
+from fastapi_pagination.api import _page_val, create_page, resolve_params
+from fastapi_pagination.bases import AbstractPage, AbstractParams
+from fastapi_pagination.cursor import CursorPage as FastAPICursorPage
 from fastapi_pagination.customization import CustomizedPage, UseParamsFields
+from fastapi_pagination.ext.sqlalchemy import create_count_query
+from pydantic import BaseModel, PrivateAttr, TypeAdapter, ValidationError, create_model
+from pydantic_core import to_jsonable_python
+from sqlalchemy import ClauseElement, ColumnElement, Executable, Select, Table, and_, func, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import DeclarativeBase, InstrumentedAttribute
+from sqlalchemy.sql import column as sql_column
+from sqlalchemy.sql import table as sql_table
+
+from app.config import config
+from app.core.cache import TTLCache, get_entity_version
+from app.core.enums import CountStrategyEnum
+from app.core.exceptions.base_exception import BadRequestError
+
+T = TypeVar("T")
+
+# Key of the version column in the rows selected by `get_all_version` of the repositories
+VERSION_KEY: str = "version"
+
+
+class Params(FastAPIPaginationParams):
+    count: CountStrategyEnum = Query(
+        CountStrategyEnum.EXACT,
+        description="How to count the total: exact, none (skip it), estimate (planner estimate) or cached",
+    )
+
+
+class BasePage(FastAPIPaginationPage[T], Generic[T]):
+    """
+    Page with the `has_next` flag, which is known even if the total is not counted.
+    """
+
+    has_next: bool | None = None
+    # Versions of the items before they were validated into the item schema, see `get_page_version`
+    _items_version: tuple[Any, ...] | None = PrivateAttr(default=None)
+
+    __params_type__ = Params
+
+
+class BaseCursorPage(FastAPICursorPage[T], Generic[T]):
+    _items_version: tuple[Any, ...] | None = PrivateAttr(default=None)
+
 
 Page = CustomizedPage[
-    FastAPIPaginationPage,
+    BasePage,
     UseParamsFields(size=Query(100, ge=1, le=1000)),
 ]
+
+CursorPage = CustomizedPage[
+    BaseCursorPage,
+    UseParamsFields(size=Query(100, ge=1, le=1000)),
+]
+
+KeysetColumn = tuple[InstrumentedAttribute, bool]
+
+
+@dataclass(frozen=True, slots=True)
+class KeysetCursor:
+    """
+    Decoded keyset cursor.
+
+    `values` holds the sort key of the boundary row (one value per keyset column),
+    `backwards` tells whether the page must be read before (True) or after (False) that row.
+    """
+
+    values: tuple[Any, ...]
+    backwards: bool = False
+
+    def encode(self) -> str:
+        return orjson.dumps({"v": to_jsonable_python(self.values), "b": self.backwards}).decode()
+
+
+def resolve_page() -> type[AbstractPage]:
+    """
+    Returns the page class of the current endpoint (e.g. `Page[ExampleDetail]`), which `create_page` validates
+    the items into. `fastapi-pagination` doesn't expose it, so it's read from the context variable directly.
+    """
+    return _page_val.get()
+
+
+@lru_cache(maxsize=None)
+def get_dict_page(page: type[AbstractPage]) -> type[AbstractPage]:
+    """
+    Returns the page class with the items as plain dictionaries, e.g. `Page[ExampleDetail]` gives `Page[dict]`.
+
+    :param page: Page class of the endpoint, see `resolve_page`.
+    """
+    origin: type[AbstractPage] = page.__pydantic_generic_metadata__["origin"] or page
+
+    return origin[dict[str, Any]]  # type: ignore[index]
+
+
+@lru_cache(maxsize=None)
+def get_sparse_page(page: type[AbstractPage], fields: tuple[str, ...]) -> type[AbstractPage]:
+    """
+    Returns the page class with the items limited to the requested fields of a sparse fieldset,
+    e.g. `Page[ExampleDetail]` with `fields=("id", "name")` gives the page of `ExampleDetailFields` with two fields.
+    The fields, which the item schema doesn't declare, aren't exposed.
+
+    :param page: Page class of the endpoint, see `resolve_page`.
+    :param fields: Selected columns.
+    """
+    metadata: dict[str, Any] = page.__pydantic_generic_metadata__
+    item_schema: Any = metadata["args"][0] if metadata["args"] else None
+
+    if not isinstance(item_schema, type) or not issubclass(item_schema, BaseModel):
+        return get_dict_page(page)
+
+    sparse_item_schema: type[BaseModel] = create_model(
+        f"{item_schema.__name__}Fields",
+        __config__=item_schema.model_config,
+        **{
+            name: (field_info.annotation, field_info)
+            for name, field_info in item_schema.model_fields.items()
+            if name in fields
+        },
+    )
+
+    return (metadata["origin"] or page)[sparse_item_schema]  # type: ignore[index]
+
+
+def _get_item_version(item: Any) -> Any:
+    if not isinstance(item, dict):
+        return item.id, get_entity_version(item)
+
+    # Rows of a sparse fieldset have no version, so their values are compared instead
+    return (item["id"], item[VERSION_KEY]) if VERSION_KEY in item else tuple(item.items())
+
+
+def _create_versioned_page(items: Sequence[Any], **kwargs: Any) -> AbstractPage:
+    """
+    Creates the page and keeps the versions of the items, which may be lost by the validation into the item schema.
+    """
+    page: AbstractPage = create_page(items, **kwargs)
+
+    if "_items_version" in (page.__private_attributes__ or {}):
+        page._items_version = tuple(_get_item_version(item) for item in items)  # type: ignore[attr-defined]
+
+    return page
+
+
+def get_page_version(page: AbstractPage) -> tuple[Any, ...]:
+    """
+    Version of the page based on the `CommonMixin` timestamps: the total, and the IDs with the versions of the items.
+    The items are either the ORM objects, or the rows with `id` and `version` keys (see `get_all_version`
+    of the repositories), both give the same version of the same page.
+    """
+    items_version: tuple[Any, ...] | None = getattr(page, "_items_version", None)
+
+    if items_version is None:
+        items_version = tuple(_get_item_version(item) for item in page.items)
+
+    return getattr(page, "total", None), items_version
+
+
+@lru_cache(maxsize=None)
+def _get_type_adapter(python_type: type) -> TypeAdapter:
+    return TypeAdapter(python_type)
+
+
+def get_keyset_columns(model: type[DeclarativeBase], ordering: Sequence[str] | None = None) -> list[KeysetColumn]:
+    """
+    Builds the list of keyset columns from the `order_by` values of a filter.
+
+    The primary key is always appended as a tiebreaker, so the resulting sort key is unique.
+
+    :param model: SQLAlchemy model which is paginated.
+    :param ordering: Ordering values in the `fastapi-filter` format, e.g. `["-created_at", "name"]`.
+
+    :return: List of (column, is_descending) pairs.
+    """
+    columns: list[KeysetColumn] = [
+        (getattr(model, field_name.replace("-", "").replace("+", "")), field_name.startswith("-"))
+        for field_name in ordering or []
+    ]
+
+    if not any(column.key == "id" for column, _ in columns):
+        columns.append((getattr(model, "id"), False))
+
+    return columns
+
+
+def decode_keyset_cursor(cursor: str | bytes | None, columns: list[KeysetColumn]) -> KeysetCursor | None:
+    """
+    Decodes the raw cursor and coerces its values into the python types of the keyset columns.
+
+    :raises BadRequestError: If the cursor is malformed or doesn't match the current ordering.
+    """
+    if not cursor:
+        return None
+
+    try:
+        payload: dict[str, Any] = orjson.loads(cursor)
+        raw_values: list[Any] = payload["v"]
+
+        if len(raw_values) != len(columns):
+            raise ValueError("Cursor doesn't match the requested ordering")
+
+        values = tuple(
+            _get_type_adapter(column.type.python_type).validate_python(value) if value is not None else None
+            for (column, _), value in zip(columns, raw_values)
+        )
+
+    except (orjson.JSONDecodeError, KeyError, TypeError, ValueError, ValidationError):
+        raise BadRequestError("Invalid cursor value")
+
+    return KeysetCursor(values=values, backwards=bool(payload.get("b")))
+
+
+def _seek_predicate(columns: list[KeysetColumn], cursor: KeysetCursor) -> ColumnElement[bool]:
+    """
+    Expands the row comparison `(a, b, id) > (:a, :b, :id)` into an OR-chain,
+    because the columns may be sorted in different directions.
+    """
+    clauses: list[ColumnElement[bool]] = []
+
+    for index, (column, descending) in enumerate(columns):
+        value = cursor.values[index]
+        comparison = column < value if descending != cursor.backwards else column > value
+        equalities = [prev_column == cursor.values[i] for i, (prev_column, _) in enumerate(columns[:index])]
+
+        clauses.append(and_(*equalities, comparison))
+
+    return or_(*clauses)
+
+
+def _get_row_key(item: Any, columns: list[KeysetColumn]) -> tuple[Any, ...]:
+    if isinstance(item, dict):
+        return tuple(item[column.key] for column, _ in columns)
+
+    return tuple(getattr(item, column.key) for column, _ in columns)
+
+
+def is_entity_select(stmt: Select) -> bool:
+    """
+    Checks whether the statement selects a single ORM entity, i.e. `select(Model)`, rather than separate columns.
+    """
+    descriptions = stmt.column_descriptions
+
+    return len(descriptions) == 1 and descriptions[0]["expr"] is descriptions[0]["entity"]
+
+
+async def paginate_by_cursor(
+    session: AsyncSession,
+    stmt: Select,
+    model: type[DeclarativeBase],
+    ordering: Sequence[str] | None = None,
+    *,
+    params: AbstractParams | None = None,
+    unique: bool = False,
+) -> AbstractPage:
+    """
+    Keyset (seek) pagination.
+
+    Instead of `LIMIT/OFFSET` the page boundary is expressed as a `WHERE` predicate over the sort key,
+    so every page costs the same as the first one, regardless of how deep the client has scrolled.
+
+    NOTE: Columns used for ordering should be NOT NULL, because NULL values can't be compared by the seek predicate.
+
+    :param session: Database session.
+    :param stmt: Filtered statement, any existing ordering is replaced by the keyset ordering.
+    :param model: SQLAlchemy model which is paginated.
+    :param ordering: Ordering values in the `fastapi-filter` format.
+    :param params: Cursor pagination params. If None, params are resolved from the request context.
+    :param unique: If True, apply unique filtering to the objects, otherwise do nothing.
+
+    :return: Cursor page with opaque next/previous cursors. If the statement selects separate columns,
+             the items are dictionaries, and the keyset columns must be among the selected ones.
+    """
+    params = resolve_params(params)
+    raw_params = params.to_raw_params()
+
+    columns: list[KeysetColumn] = get_keyset_columns(model, ordering)
+    cursor: KeysetCursor | None = decode_keyset_cursor(raw_params.cursor, columns)
+    backwards: bool = bool(cursor and cursor.backwards)
+
+    stmt = stmt.order_by(None).order_by(
+        *[column.desc() if descending != backwards else column.asc() for column, descending in columns]
+    )
+
+    if cursor:
+        stmt = stmt.where(_seek_predicate(columns, cursor))
+
+    result = await session.execute(stmt.limit(raw_params.size + 1))
+
+    if unique:
+        result = result.unique()
+
+    items: list[Any] = (
+        list(result.scalars().all()) if is_entity_select(stmt) else [dict(row._mapping) for row in result.all()]
+    )
+    has_more: bool = len(items) > raw_params.size
+    items = items[: raw_params.size]
+
+    if backwards:
+        items.reverse()
+
+    next_cursor: KeysetCursor | None = None
+    previous_cursor: KeysetCursor | None = None
+
+    if items:
+        first_key, last_key = _get_row_key(items[0], columns), _get_row_key(items[-1], columns)
+
+        if has_more or backwards:
+            next_cursor = KeysetCursor(values=last_key)
+
+        if (has_more and backwards) or (cursor and not backwards):
+            previous_cursor = KeysetCursor(values=first_key, backwards=True)
+
+    return _create_versioned_page(
+        items,
+        params=params,
+        next_=next_cursor.encode() if next_cursor else None,
+        previous=previous_cursor.encode() if previous_cursor else None,
+    )
+
+
+# Totals of the `cached` count strategy by the normalized statement
+count_cache: TTLCache[tuple[str, str], int] = TTLCache(config.cache.count_maxsize, config.cache.count_ttl)
+
+
+pg_class = sql_table("pg_class", sql_column("oid"), sql_column("reltuples"))
+
+
+class _Explain(Executable, ClauseElement):
+    inherit_cache = False
+
+    def __init__(self, stmt: Select):
+        self.stmt = stmt
+
+
+@compiles(_Explain, "postgresql")
+def _compile_explain(element: _Explain, compiler: Any, **kwargs: Any) -> str:
+    return f"EXPLAIN (FORMAT JSON) {compiler.process(element.stmt, **kwargs)}"
+
+
+async def estimate_count(session: AsyncSession, stmt: Select) -> int:
+    """
+    Estimates the number of rows of the statement without running it.
+
+    An unfiltered statement over a single table uses `pg_class.reltuples`, which is maintained by ANALYZE.
+    Otherwise, the estimate of the query planner is taken from `EXPLAIN`.
+    """
+    froms = stmt.get_final_froms()
+
+    if stmt.whereclause is None and len(froms) == 1 and isinstance(froms[0], Table):
+        reltuples: float | None = await session.scalar(
+            select(pg_class.c.reltuples).where(pg_class.c.oid == func.to_regclass(froms[0].fullname))
+        )
+
+        # The table has never been analyzed yet, if reltuples is negative
+        if reltuples is not None and reltuples >= 0:
+            return int(reltuples)
+
+    plan: Any = await session.scalar(_Explain(stmt.order_by(None)))
+
+    if isinstance(plan, str):
+        plan = orjson.loads(plan)
+
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+def _get_count_cache_key(session: AsyncSession, stmt: Select) -> tuple[str, str]:
+    """
+    Builds the key of the statement with bound values, ordering doesn't affect the total, so it's dropped.
+    """
+    compiled = stmt.order_by(None).compile(dialect=session.get_bind().dialect)
+
+    return str(compiled), repr(sorted(compiled.params.items()))
+
+
+async def _count(session: AsyncSession, stmt: Select, count_strategy: CountStrategyEnum) -> int | None:
+    match count_strategy:
+        case CountStrategyEnum.NONE:
+            return None
+
+        case CountStrategyEnum.ESTIMATE:
+            return await estimate_count(session, stmt)
+
+        case CountStrategyEnum.CACHED:
+            key = _get_count_cache_key(session, stmt)
+
+            if (total := count_cache.get(key)) is None:
+                total = await session.scalar(create_count_query(stmt))
+                count_cache.set(key, total)
+
+            return total
+
+    return await session.scalar(create_count_query(stmt))
+
+
+async def paginate_with_count(
+    session: AsyncSession,
+    stmt: Select,
+    *,
+    params: AbstractParams | None = None,
+    count_strategy: CountStrategyEnum | None = None,
+    unique: bool = True,
+) -> AbstractPage:
+    """
+    LIMIT/OFFSET pagination with a configurable way of counting the total.
+
+    One extra row is fetched to tell whether there is a next page, so `has_next` is known for every strategy.
+    If the page turns out to be the last one, the total is derived from it and the count query is skipped.
+
+    :param session: Database session.
+    :param stmt: Filtered and sorted statement.
+    :param params: Pagination params. If None, params are resolved from the request context.
+    :param count_strategy: How to count the total. Default is the `count` query param, or exact if it's missing:
+                           - exact: `SELECT count(*)` over the statement;
+                           - none: the total is not counted;
+                           - estimate: estimate of the query planner, it may be far off for selective filters;
+                           - cached: exact count, which is cached per statement for `CACHE_COUNT_TTL` seconds.
+    :param unique: If True, apply unique filtering to the objects, otherwise do nothing.
+
+    :return: Page with the total (or None) and the `has_next` flag. If the statement selects separate columns,
+             the items are dictionaries.
+    """
+    params = resolve_params(params)
+    raw_params = params.to_raw_params().as_limit_offset()
+    count_strategy = count_strategy or getattr(params, "count", None) or CountStrategyEnum.EXACT
+
+    page_stmt = stmt.offset(raw_params.offset)
+
+    if raw_params.limit is not None:
+        page_stmt = page_stmt.limit(raw_params.limit + 1)
+
+    result = await session.execute(page_stmt)
+
+    if is_entity_select(stmt):
+        items: list[Any] = list((result.unique() if unique else result).scalars().all())
+    else:
+        items = [dict(row._mapping) for row in result.all()]
+
+    has_next: bool = raw_params.limit is not None and len(items) > raw_params.limit
+    items = items[: raw_params.limit]
+
+    if not has_next and (items or not raw_params.offset):
+        total: int | None = (raw_params.offset or 0) + len(items) if count_strategy != CountStrategyEnum.NONE else None
+    else:
+        total = await _count(session, stmt, count_strategy)
+
+        if total is not None and count_strategy == CountStrategyEnum.ESTIMATE:
+            # Planner statistics may lag behind, but the total can't be less than the rows seen so far
+            total = max(total, (raw_params.offset or 0) + len(items) + int(has_next))
+
+    return _create_versioned_page(items, params=params, total=total, has_next=has_next)
@@ -0,0 +1,140 @@
+"""
+Sargable predicates.
+
+A predicate can use a B-tree index only if it compares the bare column with a constant. Conditions like
+`date(created_at) = '2024-01-01'` or `name ILIKE 'abc%'` wrap the column into a function, so Postgres has to
+scan the whole table. The builders below express the same conditions in an index-friendly form:
+days become half-open ranges of timestamps, and case-insensitive prefix searches become `lower(column) LIKE`.
+"""
+
+from datetime import date, datetime, timedelta
+from operator import eq, ge, gt, le, lt, ne
+from typing import Any, Callable
+
+from sqlalchemy import ColumnElement, Date, DateTime, and_, cast, func, literal, or_
+
+# Operators of `fastapi-filter`, which can be applied to a day, None stands for equality
+DAY_OPERATORS: dict[str | None, Callable[[Any, Any], Any]] = {
+    None: eq,
+    "neq": ne,
+    "gt": gt,
+    "gte": ge,
+    "lt": lt,
+    "lte": le,
+}
+
+# Prefix operators of the filters, which aren't provided by `fastapi-filter`, e.g. `name__istartswith=abc`
+PREFIX_OPERATORS: frozenset[str] = frozenset({"startswith", "istartswith"})
+
+LIKE_ESCAPE: str = "\\"
+
+
+def is_day(value: Any) -> bool:
+    return isinstance(value, date) and not isinstance(value, datetime)
+
+
+def is_prefix_pattern(pattern: str) -> bool:
+    """
+    Checks if the LIKE pattern matches by a prefix only, e.g. `abc%`.
+    """
+    prefix: str = pattern.removesuffix("%")
+
+    return prefix != pattern and bool(prefix) and "%" not in prefix and "_" not in prefix and "\\" not in prefix
+
+
+def get_day_bounds(column: Any, day: date) -> tuple[ColumnElement, ColumnElement]:
+    """
+    Returns the start of the day and the start of the next day in the type of the column.
+
+    The dates are cast on the database side, so the day boundaries are in the session time zone,
+    exactly like in `date(column)`.
+    """
+    return (
+        cast(literal(day, Date), column.type),
+        cast(literal(day + timedelta(days=1), Date), column.type),
+    )
+
+
+def day_predicate(column: Any, day: date, operator: str | None = None) -> ColumnElement[bool]:
+    """
+    Compares the timestamp column with a whole day, e.g. `created_at__lte=2024-01-31` includes the whole day.
+
+    :param column: Model column. If it isn't a timestamp, the day is compared with the column as is.
+    :param day: Day to compare with.
+    :param operator: `fastapi-filter` operator, one of `DAY_OPERATORS`.
+    """
+    if not isinstance(column.type, DateTime):
+        return DAY_OPERATORS[operator](column, day)
+
+    day_start, next_day_start = get_day_bounds(column, day)
+
+    match operator:
+        case None:
+            return and_(column >= day_start, column < next_day_start)
+        case "neq":
+            return or_(column < day_start, column >= next_day_start)
+        case "gt":
+            return column >= next_day_start
+        case "gte":
+            return column >= day_start
+        case "lt":
+            return column < day_start
+        case "lte":
+            return column < next_day_start
+
+    raise ValueError(f"Operator '{operator}' can't be applied to a day.")
+
+
+def range_predicate(column: Any, lower: date | None = None, upper: date | None = None) -> ColumnElement[bool] | None:
+    """
+    Builds an inclusive range condition. The missing bounds are skipped rather than replaced with sentinels,
+    and the days are expanded to the half-open ranges of timestamps.
+
+    :return: Condition, or None if both bounds are missing.
+    """
+    conditions: list[ColumnElement[bool]] = []
+
+    if lower is not None:
+        conditions.append(day_predicate(column, lower, "gte") if is_day(lower) else column >= lower)
+
+    if upper is not None:
+        conditions.append(day_predicate(column, upper, "lte") if is_day(upper) else column <= upper)
+
+    return and_(*conditions) if conditions else None
+
+
+def escape_like(value: str) -> str:
+    """
+    Escapes the wildcards of LIKE, so the value is matched literally.
+    """
+    return value.replace(LIKE_ESCAPE, LIKE_ESCAPE * 2).replace("%", f"{LIKE_ESCAPE}%").replace("_", f"{LIKE_ESCAPE}_")
+
+
+def prefix_predicate(column: Any, operator: str, prefix: str) -> ColumnElement[bool]:
+    """
+    Builds a prefix search condition with a constant pattern, e.g. `lower(column) LIKE 'abc%'`. The case-insensitive
+    search can use an expression index with `text_pattern_ops` (see `create_prefix_index` migration helper),
+    the case-sensitive one can use an index on the column with `text_pattern_ops`.
+
+    :param operator: `startswith` or `istartswith`.
+    :param prefix: Prefix, which is matched literally.
+    """
+    pattern: str = f"{escape_like(prefix)}%"
+
+    if operator == "istartswith":
+        return func.lower(column).like(pattern.lower(), escape=LIKE_ESCAPE)
+
+    return column.like(pattern, escape=LIKE_ESCAPE)
+
+
+def like_predicate(column: Any, operator: str, pattern: str) -> ColumnElement[bool]:
+    """
+    Builds a LIKE/ILIKE condition. A case-insensitive prefix pattern (`column__ilike=abc%`) is rewritten into
+    the same condition as `column__istartswith=abc`.
+
+    :param operator: `like` or `ilike`.
+    """
+    if operator == "ilike" and is_prefix_pattern(pattern):
+        return prefix_predicate(column, "istartswith", pattern.removesuffix("%"))
+
+    return getattr(column, operator)(pattern)
@@ -1,19 +1,45 @@
 from abc import ABC
-from typing import Any, Generic, Sequence
+from contextlib import nullcontext
+from datetime import datetime
+from itertools import batched
+from typing import Any, AsyncIterator, Callable, ClassVar, Generic, Hashable, Sequence
 from uuid import UUID
 
 from fastapi_filter.contrib.sqlalchemy import Filter
 from fastapi_pagination import Page
-from fastapi_pagination.ext.sqlalchemy import paginate
-from sqlalchemy import Select, delete, inspect, select, update
-from sqlalchemy.dialects.postgresql import insert
+from fastapi_pagination.api import resolve_params, set_page
+from fastapi_pagination.bases import is_cursor
+from sqlalchemy import Executable, Select, any_, bindparam, cast, column, delete, func, inspect, select, update, values
+from sqlalchemy.dialects.postgresql import ARRAY, insert
 from sqlalchemy.exc import DBAPIError, NoResultFound
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import noload
+from sqlalchemy.orm import make_transient_to_detached, noload
 from sqlalchemy.sql.roles import ColumnsClauseRole
 
-from app.core.exceptions.base_exception import NotFoundError, raise_db_error
+from app.core.cache import (
+    EntityCache,
+    ResultCache,
+    get_entity_version,
+    has_pending_invalidations,
+    track_invalidation,
+)
+from app.core.enums import CountStrategyEnum
+from app.core.exceptions.base_exception import BadRequestError, NotFoundError, raise_db_error
+from app.core.filters import BaseFilter
+from app.core.helpers import get_columns_for_model
+from app.core.loaders import ENTITY_LOADERS_KEY, EntityLoader
+from app.core.pagination import (
+    VERSION_KEY,
+    get_dict_page,
+    get_keyset_columns,
+    get_page_version,
+    get_sparse_page,
+    paginate_by_cursor,
+    paginate_with_count,
+    resolve_page,
+)
 from app.core.types import CreateSchema, DetailSchema, Model, UpdateSchema
+from app.db.transactions import has_writes, in_unit_of_work, releases_connection
 
 
 class CRUDRepository(ABC, Generic[Model, DetailSchema, CreateSchema, UpdateSchema]):
@@ -22,10 +48,69 @@ class CRUDRepository(ABC, Generic[Model, DetailSchema, CreateSchema, UpdateSchem
     """
 
     sql_model: Model
+    # Keep `bulk_batch_size * number of columns` below the PostgreSQL limit of 32767 bind parameters per statement.
+    bulk_batch_size: int = 500
+    # Columns of the unique constraint/index used to detect conflicts in `upsert`.
+    upsert_conflict_target: tuple[str, ...] = ("id",)
+    # If True, `get` calls are coalesced into batched `WHERE id = ANY(...)` queries built from `get_query`,
+    # and cached until the end of the request.
+    batch_loading: bool = False
+    # Opt-in read-through cache of `get`, e.g. `entity_cache = EntityCache(maxsize=10_000, ttl=30)`.
+    # It's bypassed if `get_query` has loader options, see `uses_entity_cache`.
+    entity_cache: EntityCache | None = None
+    # Opt-in cache of the `get_all` pages, e.g. `result_cache = ResultCache(maxsize=1_000, ttl=5)`.
+    result_cache: ResultCache | None = None
+    # Number of rows fetched from the server-side cursor at once by `stream`.
+    stream_fetch_size: int = 1000
+
+    # Statements of the hot paths, which are built once per repository class, see `get_statement`.
+    _statements: ClassVar[dict[str, Executable]] = {}
+
+    def __init_subclass__(cls, **kwargs: Any) -> None:
+        super().__init_subclass__(**kwargs)
+        cls._statements = {}
 
     def __init__(self, session: AsyncSession):
         self.session = session
 
+    def get_statement(self, name: str, build: Callable[[], Executable]) -> Executable:
+        """
+        Returns the statement, which is built on the first call and reused afterward by all instances of
+        the repository class. Values must be passed as bound parameters at execution, so the statement
+        is also taken from the compiled cache without being rebuilt.
+
+        NOTE: `get_query` must not depend on the state of the repository instance, because it's cached too.
+
+        :param name: Name of the statement, unique within the repository class.
+        :param build: Function which builds the statement.
+
+        :return: Statement.
+        """
+        if (stmt := self._statements.get(name)) is None:
+            stmt = self._statements[name] = build()
+
+        return stmt
+
+    @property
+    def loader(self) -> EntityLoader[Model]:
+        """
+        Request-scoped batching loader of the model, it's shared by all repositories using the same session.
+        """
+        loaders: dict[type, EntityLoader] = self.session.info.setdefault(ENTITY_LOADERS_KEY, {})
+
+        if (loader := loaders.get(self.sql_model)) is None:  # type: ignore[call-overload]
+            loader = loaders[self.sql_model] = EntityLoader(self._load_batch)  # type: ignore[index]
+
+        return loader
+
+    @property
+    def uses_entity_cache(self) -> bool:
+        """
+        The entity cache holds the column values only, so `get` bypasses it if `get_query` has loader options
+        (e.g. `selectinload` of relationships), which the cached entities couldn't reproduce.
+        """
+        return self.entity_cache is not None and not self.get_statement("get_query", self.get_query)._with_options
+
     def get_query(self) -> Select:
         """
         Returns a query object for the model.
@@ -34,13 +119,15 @@ class CRUDRepository(ABC, Generic[Model, DetailSchema, CreateSchema, UpdateSchem
         """
         return select(self.sql_model)
 
+    @releases_connection
     async def get(
         self,
         obj_id: int | UUID,
         *,
         raise_error: bool = True,
+        fields: Sequence[str] | None = None,
         **kwargs: Any,
-    ) -> Model | None:
+    ) -> Model | dict[str, Any] | None:
         """
         This method retrieves an object from the database using its ID.
 
@@ -48,26 +135,76 @@ class CRUDRepository(ABC, Generic[Model, DetailSchema, CreateSchema, UpdateSchem
         :param raise_error: A flag that determines whether an error should be raised if the object is not found.
                             If True, a NotFoundError will be raised when the object is not found.
                             If False, the method will return None when the object is not found. Default is True.
+        :param fields: Sparse fieldset. If provided, only these columns (and `id`) are selected, and a dictionary
+                       is returned instead of the ORM instance.
         :param kwargs: Additional keyword arguments.
 
         :return: The retrieved object if it exists. If the object does not exist and raise_error is False, the method
                  will return None.
 
         :raises NotFoundError: If raise_error is True and the object is not found in the database.
+        :raises BadRequestError: If some of the requested fields are not columns of the model.
         """
-        stmt = self.get_query().filter_by(id=obj_id)
-
-        if not (result := await self.session.scalar(stmt)) and raise_error:
+        if fields:
+            return await self._get_fields(obj_id, fields, raise_error=raise_error)
+
+        if self.uses_entity_cache and (cached_values := self.entity_cache.get(obj_id)) is not None:  # type: ignore
+            return await self._from_cache(cached_values)
+
+        if self.batch_loading:
+            result = await self.loader.load(obj_id)
+        else:
+            stmt = self.get_statement(
+                "get",
+                lambda: self.get_query().where(self.sql_model.id == bindparam("obj_id")),  # type: ignore[attr-defined]
+            )
+            result = await self.session.scalar(stmt, {"obj_id": obj_id})
+
+        if not result and raise_error:
             raise NotFoundError(detail=f"{self.sql_model.__name__} object with {obj_id=!s} not found")
 
+        if result and self.uses_entity_cache and not has_pending_invalidations(self.session):
+            self.entity_cache.put(result)  # type: ignore[union-attr]
+
         return result
 
+    async def _get_fields(
+        self, obj_id: int | UUID, fields: Sequence[str], *, raise_error: bool
+    ) -> dict[str, Any] | None:
+        """
+        Internal method to retrieve only the requested columns of an object.
+        """
+        if unknown_fields := set(fields) - set(get_columns_for_model(self.sql_model)):  # type: ignore[arg-type]
+            raise BadRequestError(f"You can't select unknown fields: {', '.join(sorted(unknown_fields))}.")
+
+        stmt = (
+            self.get_query()
+            .with_only_columns(*self.get_select_entities(include_columns=["id", *fields]))
+            .where(self.sql_model.id == obj_id)  # type: ignore[attr-defined]
+        )
+
+        if not (result := (await self.session.execute(stmt)).mappings().one_or_none()) and raise_error:
+            raise NotFoundError(detail=f"{self.sql_model.__name__} object with {obj_id=!s} not found")
+
+        return dict(result) if result else None
+
+    async def _from_cache(self, values: dict[str, Any]) -> Model:
+        """
+        Internal method to attach the cached entity to the session without loading it from DB.
+        """
+        obj = self.sql_model(**values)  # type: ignore[operator]
+        make_transient_to_detached(obj)
+
+        return await self.session.merge(obj, load=False)
+
+    @releases_connection
     async def get_all(
         self,
         query_filter: Filter = None,
         raw_result: bool = False,
         *,
         is_unique: bool = False,
+        count_strategy: CountStrategyEnum | None = None,
         **kwargs: Any,
     ) -> Page[DetailSchema] | list[Model]:  # type: ignore
         """
@@ -78,38 +215,250 @@ class CRUDRepository(ABC, Generic[Model, DetailSchema, CreateSchema, UpdateSchem
                            If True, a list of raw results will be returned.
                            If False, a Page object with paginated results will be returned. Default is False.
         :param is_unique: If True, apply unique filtering to the objects, otherwise do nothing.
+                          It isn't needed for the nested filters with the EXISTS strategy, which don't multiply rows.
+        :param count_strategy: How to count the total of the page. Default is the `count` query param of the `Page`,
+                               see `paginate_with_count`.
         :param kwargs: Additional keyword arguments.
 
         :return: A Page object with paginated results if raw_result is False, otherwise a list of raw results.
+                 If the endpoint responds with a `CursorPage`, keyset pagination is used instead of LIMIT/OFFSET.
+                 If the filter requests a sparse fieldset, the items are dictionaries with the selected columns,
+                 or, in a page, models of the item schema limited to these fields (see `get_sparse_page`).
+                 The endpoint serializes such a page with its own type: `SerializedResponse(page, type(page))`.
 
         :raises NoResultFound: If no objects are found in the database.
         """
-        stmt = self.get_query()
+        stmt = self.get_statement("get_all", self.get_query)
+        selected_fields: list[str] | None = getattr(query_filter, "selected_fields", None)
+
+        if selected_fields:
+            stmt = stmt.with_only_columns(*self.get_select_entities(include_columns=selected_fields))
 
         if query_filter:
             stmt = query_filter.filter(stmt)
             stmt = query_filter.sort(stmt)
 
         if raw_result:
+            if selected_fields:
+                return [dict(row) for row in (await self.session.execute(stmt)).mappings().all()]  # type: ignore
+
             if is_unique:
                 return (await self.session.execute(stmt)).unique().all()  # type: ignore
 
             return (await self.session.scalars(stmt)).all()  # type: ignore
 
-        return await paginate(self.session, stmt)
+        params = resolve_params()
+        cache_key = self._get_result_cache_key(query_filter, params, is_unique, count_strategy)
+
+        if cache_key is not None and (cached_page := self.result_cache.get(cache_key)) is not None:  # type: ignore
+            return await self._page_from_cache(*cached_page)
+
+        # The items of a sparse fieldset are validated into the schema of the selected fields only,
+        # otherwise the required fields, which weren't selected, fail the validation.
+        with set_page(get_sparse_page(resolve_page(), tuple(selected_fields))) if selected_fields else nullcontext():
+            if is_cursor(params.to_raw_params()):
+                ordering: list[str] | None = (
+                    getattr(query_filter, query_filter.Constants.ordering_field_name, None) if query_filter else None
+                )
+
+                page = await paginate_by_cursor(
+                    self.session, stmt, self.sql_model, ordering, params=params, unique=is_unique
+                )
+            else:
+                page = await paginate_with_count(self.session, stmt, params=params, count_strategy=count_strategy)
+
+        # A session with uncommitted writes may read its own changes, which must not be shared
+        if cache_key is not None and not has_writes(self.session) and not has_pending_invalidations(self.session):
+            self.result_cache.put(cache_key, self._page_to_cache(page))  # type: ignore
+
+        return page  # type: ignore
+
+    def _get_result_cache_key(
+        self, query_filter: Filter | None, params: Any, is_unique: bool, count_strategy: CountStrategyEnum | None
+    ) -> Hashable | None:
+        """
+        Internal method to build the key of the `get_all` page, or None if the page can't be cached.
+        The key is invalidated by writes to the tables the filter reads, see `ResultCache`.
+        """
+        if self.result_cache is None or (query_filter is not None and not isinstance(query_filter, BaseFilter)):
+            return None
+
+        return self.result_cache.get_key(
+            query_filter.get_tables() if query_filter is not None else (),
+            # Endpoints listing the same model with different response schemas must not share pages
+            resolve_page(),
+            type(params).__name__,
+            tuple(sorted(params.model_dump(mode="json").items())),
+            is_unique,
+            count_strategy,
+            # Filters with equal values may still differ by their `Constants`, e.g. the search backend
+            f"{type(query_filter).__module__}.{type(query_filter).__qualname__}" if query_filter is not None else None,
+            query_filter.get_canonical_values() if query_filter is not None else None,
+        )
+
+    def _page_to_cache(self, page: Any) -> tuple[Any, bool]:
+        """
+        Internal method to replace the ORM objects of the page with their column values.
+        """
+        if not page.items or not isinstance(page.items[0], self.sql_model):  # type: ignore[arg-type]
+            return page, False
+
+        column_keys: list[str] = self.result_cache.column_keys  # type: ignore[union-attr]
+        items: list[dict[str, Any]] = [{key: getattr(obj, key) for key in column_keys} for obj in page.items]
+
+        return page.model_copy(update={"items": items}), True
+
+    async def _page_from_cache(self, page: Any, has_orm_items: bool) -> Any:
+        """
+        Internal method to attach the cached objects of the page to the session without loading them from DB.
+        """
+        if not has_orm_items:
+            return page
+
+        return page.model_copy(update={"items": [await self._from_cache(item_values) for item_values in page.items]})
+
+    def get_version_column(self) -> Any:
+        """
+        Returns the version of a row based on the `CommonMixin` timestamps, the same as `get_entity_version`.
+        """
+        return func.coalesce(self.sql_model.updated_at, self.sql_model.created_at)  # type: ignore[attr-defined]
+
+    @releases_connection
+    async def get_version(self, obj_id: int | UUID) -> datetime | None:
+        """
+        Retrieves the version of an object without loading the row, e.g. to answer a conditional GET.
+
+        :param obj_id: The ID of the object.
+
+        :return: `updated_at`, or `created_at` if the object was never updated. None if the object is not found.
+        """
+        stmt = self.get_statement(
+            "get_version",
+            lambda: self.get_query()
+            .with_only_columns(self.get_version_column(), maintain_column_froms=True)
+            .where(self.sql_model.id == bindparam("obj_id")),  # type: ignore[attr-defined]
+        )
+
+        return await self.session.scalar(stmt, {"obj_id": obj_id})
+
+    @releases_connection
+    async def get_all_version(
+        self, query_filter: Filter = None, *, count_strategy: CountStrategyEnum | None = None, **kwargs: Any
+    ) -> tuple[Any, ...]:
+        """
+        Retrieves the version of the `get_all` page without loading the rows: the same page is selected
+        with the IDs and the versions of the objects only.
+
+        The version changes when an object of the page is inserted, updated or deleted, or the total changes.
+        It doesn't cover:
+            - related rows, which the response schema serializes, unless their writes touch the object itself;
+            - writes which don't set `updated_at`, e.g. raw SQL;
+            - writes of the same object within the same timestamp.
+
+        :param query_filter: A SQLAlchemy Filter object, the same as passed to `get_all`. Default is None.
+        :param count_strategy: How to count the total, the same as passed to `get_all`.
+        :param kwargs: Additional keyword arguments.
+
+        :return: Version of the page, see `get_page_version`.
+        """
+        stmt = self.get_statement("get_all", self.get_query)
+
+        if query_filter:
+            stmt = query_filter.filter(stmt)
+            stmt = query_filter.sort(stmt)
+
+        params = resolve_params()
+        columns: list[Any] = [self.sql_model.id, self.get_version_column().label(VERSION_KEY)]  # type: ignore
+
+        with set_page(get_dict_page(resolve_page())):
+            if is_cursor(params.to_raw_params()):
+                ordering: list[str] | None = (
+                    getattr(query_filter, query_filter.Constants.ordering_field_name, None) if query_filter else None
+                )
+                # The keyset columns are needed to build the cursors
+                keyset_columns: list[Any] = [column for column, _ in get_keyset_columns(self.sql_model, ordering)]
+                stmt = stmt.with_only_columns(*columns, *keyset_columns, maintain_column_froms=True)
+
+                page = await paginate_by_cursor(self.session, stmt, self.sql_model, ordering, params=params)
+            else:
+                stmt = stmt.with_only_columns(*columns, maintain_column_froms=True)
+
+                page = await paginate_with_count(self.session, stmt, params=params, count_strategy=count_strategy)
+
+        return get_page_version(page)
+
+    async def stream(
+        self,
+        query_filter: Filter = None,
+        *,
+        fetch_size: int | None = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[list[dict[str, Any]]]:
+        """
+        Streams the filtered objects from a server-side cursor.
+
+        Rows are fetched from the cursor in partitions, so only `fetch_size` rows are held in memory at once.
+        The session must not be used for anything else until the iteration is finished.
+
+        :param query_filter: A SQLAlchemy Filter object to filter the objects. If the filter requests a sparse
+                             fieldset, only these columns are selected. Default is None.
+        :param fetch_size: Number of rows per partition. Default is `stream_fetch_size`.
+        :param kwargs: Additional keyword arguments.
 
+        :return: Async iterator over partitions of rows, every row is a dictionary of column values.
+        """
+        selected_fields: list[str] | None = getattr(query_filter, "selected_fields", None)
+        stmt = self.get_statement("get_all", self.get_query).with_only_columns(
+            *self.get_select_entities(include_columns=selected_fields)
+        )
+
+        if query_filter:
+            stmt = query_filter.filter(stmt)
+            stmt = query_filter.sort(stmt)
+
+        result = await self.session.stream(stmt.execution_options(yield_per=fetch_size or self.stream_fetch_size))
+
+        try:
+            async for partition in result.mappings().partitions():
+                yield [dict(row) for row in partition]
+        finally:
+            await result.close()
+
+    @releases_connection
     async def get_by_ids(self, obj_ids: Sequence[int | UUID]) -> list[Model]:
         """
         Returns a list of objects by their IDs.
 
+        IDs are sent as a single array parameter (`WHERE id = ANY(:obj_ids)`), so the statement is the same
+        regardless of the number of IDs.
+
         :param obj_ids: List of IDs.
 
         :return: List of objects.
         """
-        # noinspection PyTypeChecker
-        stmt = self.get_query().where(self.sql_model.id.in_(obj_ids)).options(noload("*"))  # type: ignore[attr-defined]
 
-        return (await self.session.scalars(stmt)).all()  # type: ignore
+        stmt = self.get_statement("get_by_ids", lambda: self._get_ids_query().options(noload("*")))
+
+        return (await self.session.scalars(stmt, {"obj_ids": list(obj_ids)})).all()  # type: ignore
+
+    async def _load_batch(self, obj_ids: Sequence[int | UUID]) -> list[Model]:
+        """
+        Internal method to load a batch of `get` calls. Unlike `get_by_ids`, the relationships are loaded
+        as `get_query` specifies, so the objects are the same as returned by a single `get`.
+        """
+        stmt = self.get_statement("load_batch", self._get_ids_query)
+
+        return (await self.session.execute(stmt, {"obj_ids": list(obj_ids)})).unique().scalars().all()  # type: ignore
+
+    def _get_ids_query(self) -> Select:
+        """
+        Internal method to build the query of objects by the array of IDs, which is passed as `obj_ids` parameter.
+        """
+        id_column = self.sql_model.id  # type: ignore[attr-defined]
+        obj_ids_param = bindparam("obj_ids", type_=ARRAY(id_column.type))
+
+        # noinspection PyTypeChecker
+        return self.get_query().where(id_column == any_(obj_ids_param))
 
     async def _apply_changes(
         self,
@@ -117,28 +466,28 @@ class CRUDRepository(ABC, Generic[Model, DetailSchema, CreateSchema, UpdateSchem
         obj_id: int | UUID = None,
         *,
         is_unique: bool,
-        autocommit: bool,
+        autocommit: bool | None,
     ) -> Model:
         """
         Internal method to store changes in DB.
+
+        The returned object is built from the `RETURNING` clause alone, there is no extra SELECT to refresh it.
+        `populate_existing` makes sure an instance, which is already present in the session, gets the new values.
         """
         try:
-            result = await self.session.execute(stmt)
+            result = await self.session.execute(stmt.execution_options(populate_existing=True))
 
             if is_unique:
                 result = result.unique()
 
             result = result.scalar_one()
 
-            if autocommit:
-                await self.session.commit()
-            else:
-                await self.session.flush()
+            self._after_write([result])
 
-            await self.session.refresh(result)
+            await self._commit(autocommit)
 
         except DBAPIError as exc:
-            await self.session.rollback()
+            await self._rollback()
             raise_db_error(exc)
 
         except NoResultFound:
@@ -150,7 +499,7 @@ class CRUDRepository(ABC, Generic[Model, DetailSchema, CreateSchema, UpdateSchem
         self,
         obj_data: dict,
         *,
-        autocommit: bool = True,
+        autocommit: bool | None = None,
         is_unique: bool = True,
         **kwargs: Any,
     ) -> Model:
@@ -158,7 +507,8 @@ class CRUDRepository(ABC, Generic[Model, DetailSchema, CreateSchema, UpdateSchem
         Creates an entity in the database and returns the created object.
 
         :param obj_data: The object to create.
-        :param autocommit: If True, commit changes immediately, otherwise flush changes.
+        :param autocommit: If False, flush changes, otherwise commit them. Within a unit of work changes are always
+                           flushed, and committed at the end of the unit of work. Default is None.
         :param is_unique: If True, apply unique filtering to the objects, otherwise do nothing.
         :param kwargs: Additional keyword arguments.
 
@@ -173,7 +523,7 @@ class CRUDRepository(ABC, Generic[Model, DetailSchema, CreateSchema, UpdateSchem
         obj_id: int | UUID,
         obj_data: dict,
         *,
-        autocommit: bool = True,
+        autocommit: bool | None = None,
         is_unique: bool = True,
         **kwargs: Any,
     ) -> Model:
@@ -182,7 +532,8 @@ class CRUDRepository(ABC, Generic[Model, DetailSchema, CreateSchema, UpdateSchem
 
         :param obj_data: The object data to update.
         :param obj_id: The ID of the object to update.
-        :param autocommit: If True, commit changes immediately, otherwise flush changes.
+        :param autocommit: If False, flush changes, otherwise commit them. Within a unit of work changes are always
+                           flushed, and committed at the end of the unit of work. Default is None.
         :param is_unique: If True, apply unique filtering to the objects, otherwise do nothing.
 
         :returns: The updated object.
@@ -191,39 +542,384 @@ class CRUDRepository(ABC, Generic[Model, DetailSchema, CreateSchema, UpdateSchem
 
         return await self._apply_changes(stmt=stmt, obj_id=obj_id, autocommit=autocommit, is_unique=is_unique)
 
+    async def create_many(
+        self,
+        objs_data: Sequence[dict],
+        *,
+        batch_size: int | None = None,
+        autocommit: bool | None = None,
+        **kwargs: Any,
+    ) -> list[Model]:
+        """
+        Creates entities in bulk using multi-row `INSERT ... RETURNING` statements.
+
+        All batches are executed in a single transaction, so either all entities are stored, or none of them.
+
+        :param objs_data: The objects to create. All of them must have the same set of keys.
+        :param batch_size: Number of rows per statement. Default is `bulk_batch_size`.
+        :param autocommit: If False, flush changes, otherwise commit them. Within a unit of work changes are always
+                           flushed, and committed at the end of the unit of work. Default is None.
+        :param kwargs: Additional keyword arguments.
+
+        :return: The created objects in the order they were provided.
+
+        :raises BaseError: Mapped database error with the number of the failed batch.
+        """
+        results: list[Model] = []
+
+        for batch_number, batch in enumerate(batched(objs_data, batch_size or self.bulk_batch_size), start=1):
+            stmt = insert(self.sql_model).values(list(batch)).returning(self.sql_model)
+
+            results.extend(await self._apply_batch(stmt, batch_number))
+
+        await self._finish_batches(autocommit=autocommit)
+
+        return results
+
+    async def update_many(
+        self,
+        objs_data: Sequence[dict],
+        *,
+        batch_size: int | None = None,
+        autocommit: bool | None = None,
+        **kwargs: Any,
+    ) -> list[Model]:
+        """
+        Updates entities in bulk using `UPDATE ... FROM (VALUES ...) RETURNING` statements.
+
+        Every item must contain the `id` key along with the values to update. Items are grouped by their set of keys,
+        because a single VALUES list can only update the same columns. All batches are executed in a single
+        transaction.
+
+        :param objs_data: The objects data to update.
+        :param batch_size: Number of rows per statement. Default is `bulk_batch_size`.
+        :param autocommit: If False, flush changes, otherwise commit them. Within a unit of work changes are always
+                           flushed, and committed at the end of the unit of work. Default is None.
+        :param kwargs: Additional keyword arguments.
+
+        :return: The updated objects. Objects that don't exist in DB are skipped, the order is not guaranteed.
+
+        :raises BaseError: Mapped database error with the number of the failed batch.
+        """
+        groups: dict[tuple[str, ...], list[dict]] = {}
+
+        for obj_data in objs_data:
+            groups.setdefault(tuple(sorted(obj_data)), []).append(obj_data)
+
+        results: list[Model] = []
+        batch_number: int = 0
+
+        for keys, group in groups.items():
+            table_columns = [self.sql_model.__table__.c[key] for key in keys]  # type: ignore[attr-defined]
+
+            for batch in batched(group, batch_size or self.bulk_batch_size):
+                batch_number += 1
+                batch_values = values(
+                    *[column(table_column.name, table_column.type) for table_column in table_columns],
+                    name="batch_values",
+                ).data([tuple(obj_data[key] for key in keys) for obj_data in batch])
+
+                stmt = (
+                    update(self.sql_model)
+                    .where(self.sql_model.id == batch_values.c.id)  # type: ignore[attr-defined]
+                    # NULL-only VALUES columns are resolved as text by Postgres, hence the explicit cast
+                    .values(
+                        {
+                            table_column.key: cast(batch_values.c[table_column.name], table_column.type)
+                            for table_column in table_columns
+                            if table_column.key != "id"
+                        }
+                    )
+                    .returning(self.sql_model)
+                    .execution_options(synchronize_session="fetch")
+                )
+
+                results.extend(await self._apply_batch(stmt, batch_number))
+
+        await self._finish_batches(autocommit=autocommit)
+
+        return results
+
+    async def upsert(
+        self,
+        obj_data: dict,
+        *,
+        conflict_target: Sequence[str] | None = None,
+        update_columns: Sequence[str] | None = None,
+        autocommit: bool | None = None,
+        is_unique: bool = True,
+        **kwargs: Any,
+    ) -> Model:
+        """
+        Creates or updates an entity with a single `INSERT ... ON CONFLICT DO UPDATE ... RETURNING` statement.
+
+        :param obj_data: The object data to insert.
+        :param conflict_target: Columns of the unique constraint to detect conflicts on. Default is
+                                `upsert_conflict_target`.
+        :param update_columns: Columns to update on conflict. Default is all provided columns except conflict target.
+        :param autocommit: If False, flush changes, otherwise commit them. Within a unit of work changes are always
+                           flushed, and committed at the end of the unit of work. Default is None.
+        :param is_unique: If True, apply unique filtering to the objects, otherwise do nothing.
+        :param kwargs: Additional keyword arguments.
+
+        :return: The created or updated object.
+        """
+        stmt = self._get_upsert_stmt([obj_data], conflict_target=conflict_target, update_columns=update_columns)
+
+        return await self._apply_changes(stmt=stmt, autocommit=autocommit, is_unique=is_unique)
+
+    async def upsert_many(
+        self,
+        objs_data: Sequence[dict],
+        *,
+        conflict_target: Sequence[str] | None = None,
+        update_columns: Sequence[str] | Sequence[Sequence[str]] | None = None,
+        batch_size: int | None = None,
+        autocommit: bool | None = None,
+        **kwargs: Any,
+    ) -> list[Model]:
+        """
+        Creates or updates entities in bulk using multi-row `INSERT ... ON CONFLICT DO UPDATE ... RETURNING`.
+
+        All batches are executed in a single transaction. The same conflict key must not appear twice in one batch,
+        otherwise Postgres rejects the statement.
+
+        :param objs_data: The objects data to insert. All of them must have the same set of keys.
+        :param conflict_target: Columns of the unique constraint to detect conflicts on. Default is
+                                `upsert_conflict_target`.
+        :param update_columns: Columns to update on conflict. Default is all provided columns except conflict target.
+                               A list of columns per object is accepted as well, then the objects with the same
+                               columns are upserted by the same statements.
+        :param batch_size: Number of rows per statement. Default is `bulk_batch_size`.
+        :param autocommit: If False, flush changes, otherwise commit them. Within a unit of work changes are always
+                           flushed, and committed at the end of the unit of work. Default is None.
+        :param kwargs: Additional keyword arguments.
+
+        :return: The created or updated objects, in the order of `objs_data`.
+
+        :raises BaseError: Mapped database error with the number of the failed batch.
+        """
+        groups: dict[tuple[str, ...] | None, list[int]] = {}
+
+        if update_columns and not isinstance(update_columns[0], str):
+            for index, obj_update_columns in enumerate(update_columns):
+                groups.setdefault(tuple(obj_update_columns), []).append(index)
+        else:
+            groups[tuple(update_columns) if update_columns is not None else None] = list(range(len(objs_data)))
+
+        results: list[Model | None] = [None] * len(objs_data)
+        batch_number: int = 0
+
+        for group_update_columns, indexes in groups.items():
+            for batch_indexes in batched(indexes, batch_size or self.bulk_batch_size):
+                batch_number += 1
+                stmt = self._get_upsert_stmt(
+                    [objs_data[index] for index in batch_indexes],
+                    conflict_target=conflict_target,
+                    update_columns=group_update_columns,
+                )
+
+                for index, obj in zip(batch_indexes, await self._apply_batch(stmt, batch_number)):
+                    results[index] = obj
+
+        await self._finish_batches(autocommit=autocommit)
+
+        return results  # type: ignore[return-value]
+
+    def _get_upsert_stmt(
+        self,
+        objs_data: list[dict],
+        *,
+        conflict_target: Sequence[str] | None,
+        update_columns: Sequence[str] | None,
+    ):
+        """
+        Internal method to build the `INSERT ... ON CONFLICT DO UPDATE ... RETURNING` statement.
+        """
+        conflict_target = conflict_target or self.upsert_conflict_target
+
+        if update_columns is None:
+            update_columns = [key for key in objs_data[0] if key not in conflict_target]
+
+        stmt = insert(self.sql_model).values(objs_data)
+        set_: dict[str, Any] = {key: stmt.excluded[key] for key in update_columns}
+
+        if set_:
+            # Column `onupdate` defaults (e.g. `updated_at`) aren't applied to ON CONFLICT DO UPDATE automatically.
+            # SQL expressions and scalars are forwarded, callables expect the execution context and are skipped.
+            for table_column in self.sql_model.__table__.columns:  # type: ignore[attr-defined]
+                onupdate = table_column.onupdate
+
+                if table_column.key in set_ or onupdate is None:
+                    continue
+
+                if getattr(onupdate, "is_clause_element", False) or getattr(onupdate, "is_scalar", False):
+                    set_[table_column.key] = onupdate.arg
+        else:
+            # DO NOTHING doesn't return conflicting rows, so a no-op update keeps the statement returning the object.
+            set_ = {key: stmt.excluded[key] for key in conflict_target}
+
+        return stmt.on_conflict_do_update(index_elements=list(conflict_target), set_=set_).returning(self.sql_model)
+
+    async def _apply_batch(self, stmt, batch_number: int) -> Sequence[Model]:
+        """
+        Internal method to execute a single batch of a bulk operation.
+        """
+        try:
+            result = (await self.session.execute(stmt.execution_options(populate_existing=True))).scalars().all()
+
+        except DBAPIError as exc:
+            await self._rollback()
+            raise_db_error(exc, context=f"Batch #{batch_number}")
+
+        self._after_write(result)
+
+        return result
+
+    async def _finish_batches(self, *, autocommit: bool | None) -> None:
+        """
+        Internal method to store the results of a bulk operation in DB.
+        """
+        try:
+            await self._commit(autocommit)
+
+        except DBAPIError as exc:
+            await self._rollback()
+            raise_db_error(exc)
+
     async def delete(
         self,
         obj_id: int | UUID,
         *,
-        autocommit: bool = True,
+        autocommit: bool | None = None,
         **kwargs: Any,
     ) -> None:
         """
         Delete an object.
 
+        `DELETE ... RETURNING id` is used to detect a missing object, so the deletion takes a single round trip.
+
         :param obj_id: The ID of the object to delete.
-        :param autocommit: If True, commit changes immediately, otherwise flush changes.
+        :param autocommit: If False, flush changes, otherwise commit them. Within a unit of work changes are always
+                           flushed, and committed at the end of the unit of work. Default is None.
 
         :raises DBAPIError: If there is an error during database operations.
         :raises NotFoundError: If item does not exist in a database.
         """
-        await self.get(obj_id=obj_id)
+        stmt = delete(self.sql_model).filter_by(id=obj_id).returning(self.sql_model.id)  # type: ignore[attr-defined]
+
+        try:
+            if (await self.session.execute(stmt)).scalar_one_or_none() is None:
+                raise NotFoundError(detail=f"{self.sql_model.__name__} object with {obj_id=!s} not found")
+
+            self._after_delete([obj_id])
+
+            await self._commit(autocommit)
+
+        except DBAPIError as exc:
+            await self._rollback()
+            raise_db_error(exc)
+
+    async def delete_many(
+        self,
+        obj_ids: Sequence[int | UUID] | None = None,
+        query_filter: Filter | None = None,
+        *,
+        autocommit: bool | None = None,
+        **kwargs: Any,
+    ) -> list[int | UUID]:
+        """
+        Delete objects by their IDs or by a filter with a single `DELETE ... RETURNING id` statement.
+
+        :param obj_ids: The IDs of the objects to delete.
+        :param query_filter: A SQLAlchemy Filter object to select the objects to delete.
+        :param autocommit: If False, flush changes, otherwise commit them. Within a unit of work changes are always
+                           flushed, and committed at the end of the unit of work. Default is None.
+
+        :return: The IDs of the deleted objects.
+
+        :raises ValueError: If neither IDs nor filter are provided.
+        :raises DBAPIError: If there is an error during database operations.
+        """
+        id_column = self.sql_model.id  # type: ignore[attr-defined]
 
-        stmt = delete(self.sql_model).filter_by(id=obj_id)
+        if query_filter is not None:
+            criteria = id_column.in_(query_filter.filter(select(id_column)))
+        elif obj_ids is not None:
+            criteria = id_column.in_(obj_ids)
+        else:
+            raise ValueError("Either `obj_ids` or `query_filter` must be provided to delete objects.")
+
+        stmt = (
+            delete(self.sql_model).where(criteria).returning(id_column).execution_options(synchronize_session="fetch")
+        )
 
         try:
-            await self.session.execute(stmt)
+            deleted_ids: list[int | UUID] = list((await self.session.execute(stmt)).scalars().all())
 
-            if autocommit:
-                await self.session.commit()
-            else:
-                await self.session.flush()
+            self._after_delete(deleted_ids)
+
+            await self._commit(autocommit)
 
         except DBAPIError as exc:
-            await self.session.rollback()
+            await self._rollback()
             raise_db_error(exc)
 
-    def get_select_entities(self, exclude_columns: list[str] | None = None) -> list[ColumnsClauseRole]:
+        return deleted_ids
+
+    async def _commit(self, autocommit: bool | None) -> None:
+        """
+        Internal method to commit the changes, or flush them if the commit is deferred.
+        """
+        if autocommit is not False and not in_unit_of_work(self.session):
+            await self.session.commit()
+        else:
+            await self.session.flush()
+
+    async def _rollback(self) -> None:
+        """
+        Internal method to roll back a failed write. Within a unit of work the rollback is left to the unit of work
+        (or its savepoint), so the changes made before the failure aren't discarded behind its back.
+        """
+        if not in_unit_of_work(self.session):
+            await self.session.rollback()
+
+    def _after_write(self, objs: Sequence[Model]) -> None:
+        """
+        Hook which is called after objects were created or updated through the repository.
+        """
+        if (loader := self.session.info.get(ENTITY_LOADERS_KEY, {}).get(self.sql_model)) is not None:
+            for obj in objs:
+                loader.prime(obj.id, obj)  # type: ignore[attr-defined]
+
+        if self.entity_cache is not None:
+            for obj in objs:
+                track_invalidation(
+                    self.session,
+                    self.entity_cache.table_name,
+                    obj.id,
+                    get_entity_version(obj),  # type: ignore
+                )
+        elif self.result_cache is not None and objs:
+            track_invalidation(self.session, self.result_cache.table_name, None)
+
+    def _after_delete(self, obj_ids: Sequence[int | UUID]) -> None:
+        """
+        Hook which is called after objects were deleted through the repository.
+        """
+        if (loader := self.session.info.get(ENTITY_LOADERS_KEY, {}).get(self.sql_model)) is not None:
+            for obj_id in obj_ids:
+                loader.clear(obj_id)
+
+        if self.entity_cache is not None:
+            for obj_id in obj_ids:
+                track_invalidation(self.session, self.entity_cache.table_name, obj_id)
+        elif self.result_cache is not None and obj_ids:
+            track_invalidation(self.session, self.result_cache.table_name, None)
+
+    def get_select_entities(
+        self, exclude_columns: list[str] | None = None, include_columns: Sequence[str] | None = None
+    ) -> list[ColumnsClauseRole]:
         """
         Returns a list of SQLAlchemy column entities to be used in a SELECT statement.
 
@@ -231,10 +927,12 @@ class CRUDRepository(ABC, Generic[Model, DetailSchema, CreateSchema, UpdateSchem
         It excludes the specified columns if provided.
 
         :param exclude_columns: Columns to be excluded from the result.
+        :param include_columns: Columns to be included in the result, all columns are included if not provided.
 
         :return: A list of SQLAlchemy column entities.
         """
         exclude_columns = set(exclude_columns or [])
+        include_columns = set(include_columns) if include_columns else None
 
         mapper = inspect(self.sql_model)
 
@@ -242,6 +940,7 @@ class CRUDRepository(ABC, Generic[Model, DetailSchema, CreateSchema, UpdateSchem
             getattr(self.sql_model, entity.key)
             for entity in mapper.c  # type: ignore[attr-defined]
             if entity.key not in exclude_columns  # type: ignore
+            and (include_columns is None or entity.key in include_columns)  # type: ignore
         ]
 
     def expire(self, instance: Model, attribute_names: list[str]) -> None:
@@ -1,5 +1,6 @@
 from abc import ABC
-from typing import Annotated, Any, Callable, Generic, Sequence, Type
+from datetime import datetime
+from typing import Annotated, Any, AsyncIterator, Callable, Generic, Mapping, Sequence, Type
 from uuid import UUID
 
 from fastapi import Depends
@@ -9,8 +10,11 @@ from fastapi_pagination import Page
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.dependencies import get_db_session
+from app.core.enums import ExportFormatEnum
 from app.core.exceptions.base_exception import BadRequestError
+from app.core.streaming import ExportResponse
 from app.core.types import CreateSchema, Model, Repository, UpdateSchema
+from app.db.engine import AsyncSessionLocal
 
 
 class CRUDService(ABC, Generic[Repository, Model, CreateSchema, UpdateSchema]):
@@ -48,6 +52,58 @@ class CRUDService(ABC, Generic[Repository, Model, CreateSchema, UpdateSchema]):
         """
         return await self.repository.get_all(query_filter, **kwargs)
 
+    async def get_version(self, obj_id: int | UUID) -> datetime | None:
+        """
+        Get the version of an object without loading it.
+
+        :param obj_id: Object ID.
+
+        :return: Latest timestamp of the object, or None if the object is not found.
+        """
+        return await self.repository.get_version(obj_id)
+
+    async def get_all_version(self, query_filter: Filter = None, **kwargs: Any) -> tuple[Any, ...]:
+        """
+        Get the version of the page of all filtered objects without loading them.
+
+        :param query_filter: Filter object.
+        :param kwargs: Additional keyword arguments.
+
+        :return: Version of the page, the same as `get_page_version` of the page returned by `get_all`.
+        """
+        return await self.repository.get_all_version(query_filter, **kwargs)
+
+    def export(
+        self,
+        query_filter: Filter = None,
+        export_format: ExportFormatEnum = ExportFormatEnum.NDJSON,
+        *,
+        fetch_size: int | None = None,
+        filename: str | None = None,
+        **kwargs: Any,
+    ) -> ExportResponse:
+        """
+        Exports all filtered objects as a streaming NDJSON or CSV response.
+
+        The response body is streamed after the request-scoped session is closed, so the rows are read
+        with a separate session, which lives until the export is finished.
+
+        :param query_filter: Filter object.
+        :param export_format: Format of the response body.
+        :param fetch_size: Number of rows fetched from DB at once. If None, the repository default is used.
+        :param filename: If provided, the response is sent as an attachment with this file name.
+        :param kwargs: Additional keyword arguments.
+
+        :return: Streaming response.
+        """
+
+        async def stream_rows() -> AsyncIterator[list[dict[str, Any]]]:
+            async with AsyncSessionLocal() as session:
+                async for rows in self.repository_class(session).stream(query_filter, fetch_size=fetch_size, **kwargs):
+                    yield rows
+
+        return ExportResponse(stream_rows(), export_format, filename=filename)
+
     async def get_by_ids(self, obj_ids: Sequence[int | UUID]) -> list[Model]:
         """
         Get objects by IDs.
@@ -59,14 +115,15 @@ class CRUDService(ABC, Generic[Repository, Model, CreateSchema, UpdateSchema]):
         return await self.repository.get_by_ids(obj_ids)
 
     async def create(
-        self, obj: CreateSchema, *, obj_id: int | UUID = None, autocommit: bool = True, **kwargs: Any
+        self, obj: CreateSchema, *, obj_id: int | UUID = None, autocommit: bool | None = None, **kwargs: Any
     ) -> Model:
         """
         Creates an entity in the database, and returns the created object.
 
         :param obj: Pydantic model.
         :param obj_id: Object ID.
-        :param autocommit: If True, commits changes to a database, if False - flushes them.
+        :param autocommit: If False, flushes changes, otherwise commits them. Within a unit of work changes are
+                           always flushed.
         :param kwargs: Additional keyword arguments.
 
         :return: Created model instance.
@@ -75,13 +132,16 @@ class CRUDService(ABC, Generic[Repository, Model, CreateSchema, UpdateSchema]):
 
         return await self.repository.create(obj_data, autocommit=autocommit, **kwargs)
 
-    async def update(self, obj_id: int | UUID, obj: UpdateSchema, *, autocommit: bool = True, **kwargs: Any) -> Model:
+    async def update(
+        self, obj_id: int | UUID, obj: UpdateSchema, *, autocommit: bool | None = None, **kwargs: Any
+    ) -> Model:
         """
         Updates an entity in the database, and returns the updated object.
 
         :param obj_id: Object ID.
         :param obj: Object to update.
-        :param autocommit: If True, commits changes to a database, if False - flushes them.
+        :param autocommit: If False, flushes changes, otherwise commits them. Within a unit of work changes are
+                           always flushed.
         :param kwargs: Additional keyword arguments.
 
         :return: Updated model instance.
@@ -91,32 +151,150 @@ class CRUDService(ABC, Generic[Repository, Model, CreateSchema, UpdateSchema]):
 
         return await self.repository.update(obj_id, obj_data, autocommit=autocommit, **kwargs)
 
-    async def delete(self, obj_id: int | UUID, *, autocommit: bool = True, **kwargs: Any) -> None:
+    async def create_many(
+        self,
+        objs: Sequence[CreateSchema],
+        *,
+        batch_size: int | None = None,
+        autocommit: bool | None = None,
+        **kwargs: Any,
+    ) -> list[Model]:
+        """
+        Creates entities in the database in batches, and returns the created objects.
+
+        :param objs: Pydantic models.
+        :param batch_size: Number of rows per statement. If None, the repository default is used.
+        :param autocommit: If False, flushes changes, otherwise commits them. Within a unit of work changes are
+                           always flushed.
+        :param kwargs: Additional keyword arguments.
+
+        :return: Created model instances.
+        """
+        objs_data: list[dict[str, Any]] = [obj.model_dump() for obj in objs]
+
+        return await self.repository.create_many(objs_data, batch_size=batch_size, autocommit=autocommit, **kwargs)
+
+    async def update_many(
+        self,
+        objs: Mapping[int | UUID, UpdateSchema],
+        *,
+        batch_size: int | None = None,
+        autocommit: bool | None = None,
+        **kwargs: Any,
+    ) -> list[Model]:
+        """
+        Updates entities in the database in batches, and returns the updated objects.
+
+        :param objs: Mapping of object IDs to objects to update.
+        :param batch_size: Number of rows per statement. If None, the repository default is used.
+        :param autocommit: If False, flushes changes, otherwise commits them. Within a unit of work changes are
+                           always flushed.
+        :param kwargs: Additional keyword arguments.
+
+        :return: Updated model instances.
+        """
+        objs_data: list[dict[str, Any]] = []
+
+        for obj_id, obj in objs.items():
+            if not (obj_data := obj.model_dump(exclude_defaults=True)):
+                raise BadRequestError(f"No data provided for updating object with {obj_id=!s}")
+
+            objs_data.append(obj_data | {"id": obj_id})
+
+        return await self.repository.update_many(objs_data, batch_size=batch_size, autocommit=autocommit, **kwargs)
+
+    async def delete(self, obj_id: int | UUID, *, autocommit: bool | None = None, **kwargs: Any) -> None:
         """
         Deletes an entity from the database.
 
         :param obj_id: Object ID.
-        :param autocommit: If True, commits changes to a database, if False - flushes them.
+        :param autocommit: If False, flushes changes, otherwise commits them. Within a unit of work changes are
+                           always flushed.
         :param kwargs: Additional keyword arguments.
 
         :return: None.
         """
         await self.repository.delete(obj_id, autocommit=autocommit)
 
+    async def delete_many(
+        self,
+        obj_ids: Sequence[int | UUID] | None = None,
+        query_filter: Filter | None = None,
+        *,
+        autocommit: bool | None = None,
+        **kwargs: Any,
+    ) -> list[int | UUID]:
+        """
+        Deletes entities from the database by their IDs or by a filter.
+
+        :param obj_ids: Object IDs.
+        :param query_filter: Filter object.
+        :param autocommit: If False, flushes changes, otherwise commits them. Within a unit of work changes are
+                           always flushed.
+        :param kwargs: Additional keyword arguments.
+
+        :return: IDs of the deleted objects.
+        """
+        return await self.repository.delete_many(obj_ids, query_filter, autocommit=autocommit)
+
     async def upsert(
-        self, obj_id: int | UUID | None, obj: CreateSchema, *, autocommit: bool = True, **kwargs: Any
+        self, obj_id: int | UUID | None, obj: CreateSchema, *, autocommit: bool | None = None, **kwargs: Any
     ) -> Model:
         """
-        Updates or creates an entity in the database, and returns the updated or created object.
+        Updates or creates an entity in the database with a single statement,
+        and returns the updated or created object.
 
         :param obj_id: Object ID.
-        :param obj: Object to update or create.
-        :param autocommit: If True, commits changes to a database, if False-flushes them.
-        :param kwargs: Additional keyword arguments.
+        :param obj: Object to update or create. On conflict only the fields which differ from their defaults are
+                    updated, unless `update_columns` is passed.
+        :param autocommit: If False, flushes changes, otherwise commits them. Within a unit of work changes are
+                           always flushed.
+        :param kwargs: Additional keyword arguments, e.g. `conflict_target` and `update_columns`.
 
         :return: Updated or created model instance.
         """
-        if obj_id and await self.get(obj_id, raise_error=False):
-            return await self.update(obj_id, obj, autocommit=autocommit, **kwargs)
+        obj_data: dict[str, Any] = obj.model_dump() | {"id": obj_id} if obj_id else obj.model_dump()
+
+        if "update_columns" not in kwargs:
+            # The full object is inserted, but on conflict only the provided fields overwrite the stored values
+            kwargs["update_columns"] = self._get_upsert_update_columns(obj, kwargs.get("conflict_target"))
+
+        return await self.repository.upsert(obj_data, autocommit=autocommit, **kwargs)
+
+    async def upsert_many(
+        self,
+        objs: Sequence[CreateSchema],
+        *,
+        batch_size: int | None = None,
+        autocommit: bool | None = None,
+        **kwargs: Any,
+    ) -> list[Model]:
+        """
+        Updates or creates entities in the database in batches, and returns the updated or created objects.
+
+        :param objs: Objects to update or create. On conflict only the fields of each object, which differ from
+                     their defaults, are updated, unless `update_columns` is passed.
+        :param batch_size: Number of rows per statement. If None, the repository default is used.
+        :param autocommit: If False, flushes changes, otherwise commits them. Within a unit of work changes are
+                           always flushed.
+        :param kwargs: Additional keyword arguments, e.g. `conflict_target` and `update_columns`.
+
+        :return: Updated or created model instances.
+        """
+        objs_data: list[dict[str, Any]] = [obj.model_dump() for obj in objs]
+
+        if "update_columns" not in kwargs:
+            # The full objects are inserted, but on conflict only the provided fields of each object are updated
+            conflict_target: Sequence[str] | None = kwargs.get("conflict_target")
+            kwargs["update_columns"] = [self._get_upsert_update_columns(obj, conflict_target) for obj in objs]
+
+        return await self.repository.upsert_many(objs_data, batch_size=batch_size, autocommit=autocommit, **kwargs)
+
+    def _get_upsert_update_columns(self, obj: CreateSchema, conflict_target: Sequence[str] | None) -> list[str]:
+        """
+        Internal method to get the columns, which overwrite the stored values on an upsert conflict:
+        the fields, which differ from their defaults.
+        """
+        conflict_target = conflict_target or self.repository.upsert_conflict_target
 
-        return await self.create(obj, obj_id=obj_id, autocommit=autocommit, **kwargs)
+        return [key for key in obj.model_dump(exclude_defaults=True) if key not in conflict_target]
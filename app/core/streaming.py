@@ -0,0 +1,106 @@
+"""
+Streaming export of result sets.
+
+Rows are read from a server-side cursor in partitions of `fetch_size` (see `CRUDRepository.stream`),
+and every partition is encoded into a single chunk of the response, so the memory usage doesn't depend
+on the size of the result.
+"""
+
+import csv
+import io
+from decimal import Decimal
+from typing import Any, AsyncIterator, Mapping, Sequence
+
+import orjson
+from starlette.background import BackgroundTask
+from starlette.responses import StreamingResponse
+
+from app.core.enums import ExportFormatEnum
+
+RowsPartitions = AsyncIterator[Sequence[Mapping[str, Any]]]
+
+EXPORT_MEDIA_TYPES: dict[ExportFormatEnum, str] = {
+    ExportFormatEnum.NDJSON: "application/x-ndjson",
+    ExportFormatEnum.CSV: "text/csv",
+}
+
+
+def _orjson_default(value: Any) -> Any:
+    if isinstance(value, Decimal):
+        return str(value)
+
+    raise TypeError
+
+
+def _to_csv_value(value: Any) -> Any:
+    if isinstance(value, (dict, list)):
+        return orjson.dumps(value, default=_orjson_default).decode()
+
+    return value
+
+
+async def encode_ndjson(partitions: RowsPartitions) -> AsyncIterator[bytes]:
+    """
+    Encodes rows as newline-delimited JSON, one object per line.
+    """
+    async for rows in partitions:
+        yield b"".join(
+            orjson.dumps(dict(row), default=_orjson_default, option=orjson.OPT_APPEND_NEWLINE) for row in rows
+        )
+
+
+async def encode_csv(partitions: RowsPartitions) -> AsyncIterator[bytes]:
+    """
+    Encodes rows as CSV, the header is taken from the keys of the first row.
+    """
+    buffer = io.StringIO()
+    writer: csv.DictWriter | None = None
+
+    async for rows in partitions:
+        if not rows:
+            continue
+
+        if writer is None:
+            writer = csv.DictWriter(buffer, fieldnames=list(rows[0].keys()))
+            writer.writeheader()
+
+        writer.writerows({key: _to_csv_value(value) for key, value in row.items()} for row in rows)
+
+        yield buffer.getvalue().encode()
+
+        buffer.seek(0)
+        buffer.truncate()
+
+
+class ExportResponse(StreamingResponse):
+    """
+    Streaming response which encodes the rows into the requested export format.
+
+    :param partitions: Async iterator over partitions of rows, e.g. `CRUDRepository.stream`.
+    :param export_format: Format of the response body.
+    :param filename: If provided, the response is sent as an attachment with this file name (without extension).
+    """
+
+    def __init__(
+        self,
+        partitions: RowsPartitions,
+        export_format: ExportFormatEnum = ExportFormatEnum.NDJSON,
+        *,
+        filename: str | None = None,
+        status_code: int = 200,
+        headers: Mapping[str, str] | None = None,
+        background: BackgroundTask | None = None,
+    ):
+        encoder = encode_csv if export_format == ExportFormatEnum.CSV else encode_ndjson
+        headers = dict(headers or {})
+
+        if filename:
+            headers["Content-Disposition"] = f'attachment; filename="{filename}.{export_format}"'
+
+        super().__init__(
+            encoder(partitions),
+            status_code=status_code,
+            headers=headers,
+            media_type=EXPORT_MEDIA_TYPES[export_format],
+            background=background,
+        )
@@ -0,0 +1,88 @@
+"""
+Unit of work.
+
+Within a unit of work the repositories only flush their changes, and all of them are committed at once when
+the unit of work ends, or rolled back if it fails:
+    ```python
+    @router.post("/")
+    async def create_parent(
+        uow: Annotated[UnitOfWork, Depends(get_unit_of_work)],
+        service: Annotated[ParentService, Depends()],
+    ) -> ParentDetail:
+        parent = await service.create(...)
+
+        async with uow.savepoint():
+            # Rolled back alone, if the block fails and the error is handled
+            ...
+    ```
+
+Services and the unit of work share the same request-scoped session, so no extra wiring is needed.
+"""
+
+from types import TracebackType
+from typing import Annotated, AsyncGenerator, Self
+
+from fastapi import Depends
+from sqlalchemy.ext.asyncio import AsyncSession, AsyncSessionTransaction
+
+from app.core.dependencies import get_db_session
+from app.db.transactions import UNIT_OF_WORK_KEY, in_unit_of_work
+
+
+class UnitOfWork:
+    """
+    Transaction scope, which spans several repository calls and ends with a single commit.
+
+    A unit of work, which is entered within another one, becomes a savepoint of the outer unit of work.
+
+    :param session: Session shared by the repositories of the unit of work.
+    """
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+        self._savepoint: AsyncSessionTransaction | None = None
+
+    async def __aenter__(self) -> Self:
+        if in_unit_of_work(self.session):
+            self._savepoint = await self.session.begin_nested()
+            return self
+
+        if not self.session.in_transaction():
+            await self.session.begin()
+
+        self.session.info[UNIT_OF_WORK_KEY] = self
+
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        if self._savepoint is not None:
+            savepoint, self._savepoint = self._savepoint, None
+            await (savepoint.rollback() if exc_type else savepoint.commit())
+            return
+
+        try:
+            if exc_type:
+                await self.session.rollback()
+            else:
+                await self.session.commit()
+        finally:
+            self.session.info.pop(UNIT_OF_WORK_KEY, None)
+
+    def savepoint(self) -> AsyncSessionTransaction:
+        """
+        Returns a savepoint (`SAVEPOINT ... RELEASE/ROLLBACK TO`), which is used as an async context manager.
+        If the block fails, only its changes are rolled back, and the unit of work can continue.
+        """
+        return self.session.begin_nested()
+
+
+async def get_unit_of_work(
+    db_session: Annotated[AsyncSession, Depends(get_db_session)],
+) -> AsyncGenerator[UnitOfWork, None]:
+    async with UnitOfWork(db_session) as unit_of_work:
+        yield unit_of_work
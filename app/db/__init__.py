@@ -1,18 +1,5 @@
 __all__ = [
-    "Stadium",
-    "StadiumSector",
-    "StadiumImage",
-    "StadiumImageAnimation",
-    "StadiumImageAnimationFrame",
-    "Event",
-    "EventSectorFrame",
+    "Example",
 ]
 
-from app.domain.event.models import Event, EventSectorFrame
-from app.domain.stadium.models import (
-    Stadium,
-    StadiumImage,
-    StadiumImageAnimation,
-    StadiumImageAnimationFrame,
-    StadiumSector,
-)
+from app.domain.example.models import Example
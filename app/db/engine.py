@@ -8,12 +8,42 @@ from sqlalchemy.ext.asyncio import (
 )
 
 from app.config import config
+from app.db.pool import InstrumentedAsyncAdaptedQueuePool, instrument_pool
+from app.db.routing import ReplicaRouter, RoutingSession
+from app.db.slow_queries import instrument_slow_queries
 
-engine: AsyncEngine = create_async_engine(
-    config.db.db_url, pool_size=config.db.pool_size, max_overflow=config.db.max_overflow
-)
 
-AsyncSessionLocal = async_sessionmaker(bind=engine, expire_on_commit=False)
+def _create_engine(url: str, name: str) -> AsyncEngine:
+    _engine = create_async_engine(
+        url,
+        poolclass=InstrumentedAsyncAdaptedQueuePool,
+        pool_size=config.db.pool_size,
+        max_overflow=config.db.max_overflow,
+        query_cache_size=config.db.query_cache_size,
+        connect_args={"prepared_statement_cache_size": config.db.prepared_statement_cache_size},
+    )
+    instrument_pool(_engine, name)
+    instrument_slow_queries(_engine)
+
+    return _engine
+
+
+engine: AsyncEngine = _create_engine(config.db.db_url, "primary")
+replica_engines: list[AsyncEngine] = [
+    _create_engine(replica_url, f"replica:{replica_host}")
+    for replica_host, replica_url in zip(config.db.replica_hosts, config.db.replica_urls)
+]
+
+AsyncSessionLocal = async_sessionmaker(
+    bind=engine,
+    expire_on_commit=False,
+    sync_session_class=RoutingSession,
+    replica_router=(
+        ReplicaRouter([replica.sync_engine for replica in replica_engines], config.db.replica_routing)
+        if replica_engines
+        else None
+    ),
+)
 
 # Ideally for tests
 AsyncScopedSession = async_scoped_session(AsyncSessionLocal, scopefunc=current_task)
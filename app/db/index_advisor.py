@@ -0,0 +1,360 @@
+"""
+Index advisor.
+
+Filter classes declare the access patterns of the API: equality and range filters, date ranges, sortable fields,
+searches and nested filters. The advisor derives the indexes these patterns need, compares them with the existing
+indexes from `pg_indexes` and reports the missing and the redundant ones. The missing indexes can be written into
+a new Alembic revision:
+
+    python -m app.db.index_advisor                              # report only
+    python -m app.db.index_advisor --generate -m "add filter indexes"
+
+The derived indexes follow the "equality first, then range" rule: an equality filter is combined with the date range
+of the filter, the sortable fields are combined with the primary key, which is the tiebreaker of the pagination.
+"""
+
+import argparse
+import asyncio
+import hashlib
+import importlib
+import re
+from dataclasses import dataclass, field
+from typing import Any, Iterator
+
+from alembic import command
+from alembic.config import Config
+from alembic.operations import ops
+from sqlalchemy import Column, text
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.orm import ColumnProperty
+
+from app.config import log
+from app.core.enums import SearchBackendEnum
+from app.core.filters import BaseFilter
+from app.db.engine import engine
+
+ALEMBIC_INI_PATH: str = "app/db/migrations/alembic.ini"
+
+# Postgres truncates longer identifiers
+MAX_INDEX_NAME_LENGTH: int = 63
+
+EQUALITY_OPERATORS: frozenset[str] = frozenset({"", "in"})
+RANGE_OPERATORS: frozenset[str] = frozenset({"gt", "gte", "lt", "lte"})
+PATTERN_OPERATORS: frozenset[str] = frozenset({"like", "ilike"})
+
+TRIGRAM_OPERATOR_CLASS: str = "gin_trgm_ops"
+
+
+@dataclass(frozen=True, slots=True)
+class IndexDefinition:
+    """
+    Index on plain columns of a table.
+
+    :param operator_class: Operator class of all columns, e.g. `gin_trgm_ops`.
+    :param name: Name of the existing index, the name of a new index is derived from the table and columns.
+                 Derived indexes have no name, so the same index required by several filters is compared equal.
+    """
+
+    table: str
+    columns: tuple[str, ...]
+    using: str = "btree"
+    operator_class: str | None = None
+    name: str | None = None
+    unique: bool = field(default=False, compare=False)
+    partial: bool = field(default=False, compare=False)
+
+    @property
+    def index_name(self) -> str:
+        if self.name:
+            return self.name
+
+        suffix: str = "_trgm" if self.operator_class == TRIGRAM_OPERATOR_CLASS else ""
+        name: str = f"ix_{self.table}_{'_'.join(self.columns)}{suffix}"
+
+        if len(name) > MAX_INDEX_NAME_LENGTH:
+            digest: str = hashlib.md5(name.encode()).hexdigest()[:8]
+            name = f"{name[: MAX_INDEX_NAME_LENGTH - len(digest) - 1]}_{digest}"
+
+        return name
+
+    def covers(self, other: "IndexDefinition") -> bool:
+        """
+        Checks if this index can serve the lookups of the other index, i.e. B-tree indexes by the leftmost prefix.
+        Partial indexes don't cover anything, because they serve only the queries matching their predicate.
+        """
+        if self.partial or self.table != other.table:
+            return False
+
+        if (self.using, self.operator_class) != (other.using, other.operator_class):
+            return False
+
+        if self.using == "btree":
+            return self.columns[: len(other.columns)] == other.columns
+
+        return set(other.columns) <= set(self.columns)
+
+
+@dataclass(slots=True)
+class IndexReport:
+    missing: dict[IndexDefinition, list[str]] = field(default_factory=dict)
+    redundant: dict[IndexDefinition, IndexDefinition] = field(default_factory=dict)
+
+
+def _get_column_name(attribute: Any) -> str:
+    return attribute.property.columns[0].name
+
+
+def _is_primary_key(attribute: Any) -> bool:
+    return all(column.primary_key for column in attribute.property.columns)
+
+
+def iter_filter_classes(base: type[BaseFilter] = BaseFilter) -> Iterator[type[BaseFilter]]:
+    """
+    Yields all imported filter classes, which are bound to a model.
+    """
+    for subclass in base.__subclasses__():
+        if getattr(subclass.Constants, "model", None) is not None:
+            yield subclass
+
+        yield from iter_filter_classes(subclass)
+
+
+def get_filter_indexes(filter_class: type[BaseFilter]) -> Iterator[tuple[IndexDefinition, str]]:
+    """
+    Derives the indexes, which the access patterns of the filter need.
+
+    :return: Pairs of the index and the reason, why it's needed.
+    """
+    constants = filter_class.Constants
+    metadata = filter_class.filter_metadata
+    table: str = constants.model.__table__.name
+    primary_key: tuple[str, ...] = tuple(column.name for column in constants.model.__table__.primary_key.columns)
+    range_column: str | None = _get_column_name(metadata.range_column) if metadata.range_column is not None else None
+    name: str = filter_class.__name__
+
+    if range_column:
+        yield IndexDefinition(table, (range_column,)), f"{name}: date range by `{range_column}`"
+
+    for field_name, (attribute, _) in metadata.operators.items():
+        # Nested filters are named after the relationships, they are handled below
+        if not isinstance(attribute.property, ColumnProperty) or _is_primary_key(attribute):
+            continue
+
+        column_name: str = _get_column_name(attribute)
+        operator: str = field_name.partition("__")[2]
+
+        if operator in EQUALITY_OPERATORS:
+            columns = (column_name, range_column) if range_column and range_column != column_name else (column_name,)
+            yield IndexDefinition(table, columns), f"{name}: equality filter `{field_name}`"
+
+        elif operator in RANGE_OPERATORS:
+            yield IndexDefinition(table, (column_name,)), f"{name}: range filter `{field_name}`"
+
+        elif operator in PATTERN_OPERATORS:
+            index = IndexDefinition(table, (column_name,), "gin", TRIGRAM_OPERATOR_CLASS)
+            yield index, f"{name}: pattern filter `{field_name}`"
+
+    for field_name in constants.fields_for_insensitive_search or []:
+        index = IndexDefinition(table, (field_name,), "gin", TRIGRAM_OPERATOR_CLASS)
+        yield index, f"{name}: insensitive search by `{field_name}`"
+
+    for field_name in constants.allowed_order_by_fields or []:
+        if field_name not in primary_key:
+            yield IndexDefinition(table, (field_name, *primary_key)), f"{name}: ordering by `{field_name}`"
+
+    search_columns: list[str] = [
+        _get_column_name(attribute) for attribute in [*metadata.multi_search_columns, *metadata.search_model_columns]
+    ]
+
+    if constants.search_backend == SearchBackendEnum.FULLTEXT and metadata.search_vector_column is not None:
+        vector_column: str = _get_column_name(metadata.search_vector_column)
+        yield IndexDefinition(table, (vector_column,), "gin"), f"{name}: full-text search"
+
+    elif search_columns:
+        for column_name in dict.fromkeys(search_columns):
+            index = IndexDefinition(table, (column_name,), "gin", TRIGRAM_OPERATOR_CLASS)
+            yield index, f"{name}: search by `{column_name}`"
+
+    # Postgres doesn't index the foreign keys, but both JOIN and EXISTS of the nested filters look them up
+    for field_name, nested_filter in metadata.nested_filters.items():
+        if (relation := filter_class.get_relation(field_name, nested_filter.Constants.model)) is None:
+            continue
+
+        for local_column, remote_column in relation.property.local_remote_pairs:
+            for column in (local_column, remote_column):
+                if isinstance(column, Column) and column.foreign_keys and not column.primary_key:
+                    index = IndexDefinition(column.table.name, (column.name,))
+                    yield index, f"{name}: nested filter `{field_name}`"
+
+
+def parse_index_definition(table: str, name: str, indexdef: str) -> IndexDefinition | None:
+    """
+    Parses `pg_indexes.indexdef`, e.g. `CREATE UNIQUE INDEX example_pkey ON public.example USING btree (id)`.
+
+    :return: Index definition, or None for the indexes on expressions, which are out of the advisor's scope.
+    """
+    if (match := re.search(r" USING (\w+) \(", indexdef)) is None:
+        return None
+
+    # The key list may contain parentheses of expressions, so it's read up to the matching parenthesis
+    depth, start = 1, match.end()
+    position: int = start
+
+    while depth and position < len(indexdef):
+        depth += {"(": 1, ")": -1}.get(indexdef[position], 0)
+        position += 1
+
+    elements: list[str] = [element.strip() for element in indexdef[start : position - 1].split(",")]
+    columns: list[str] = []
+    operator_classes: set[str] = set()
+
+    for element in elements:
+        if "(" in element:
+            return None
+
+        column_name, *options = element.split()
+        columns.append(column_name.strip('"'))
+        operator_classes.update(option for option in options if option not in ("ASC", "DESC", "NULLS", "FIRST", "LAST"))
+
+    return IndexDefinition(
+        table,
+        tuple(columns),
+        match.group(1),
+        operator_classes.pop() if len(operator_classes) == 1 else None,
+        name=name,
+        unique=indexdef.startswith("CREATE UNIQUE"),
+        partial=" WHERE " in indexdef[position:],
+    )
+
+
+async def get_existing_indexes(engine: AsyncEngine) -> list[IndexDefinition]:
+    query_string = "SELECT tablename, indexname, indexdef FROM pg_indexes WHERE schemaname = current_schema();"
+
+    async with engine.connect() as connection:
+        rows = (await connection.execute(text(query_string))).all()
+
+    return [index for row in rows if (index := parse_index_definition(*row)) is not None]
+
+
+def get_redundant_indexes(existing_indexes: list[IndexDefinition]) -> dict[IndexDefinition, IndexDefinition]:
+    """
+    Finds the B-tree indexes, which are covered by the other indexes of the same table (duplicates or prefixes).
+    Unique and partial indexes are never redundant, because they enforce constraints or have predicates.
+
+    :return: Mapping of the redundant index to the index covering it.
+    """
+    redundant: dict[IndexDefinition, IndexDefinition] = {}
+
+    for index in existing_indexes:
+        if index.unique or index.partial or index.using != "btree":
+            continue
+
+        for other in existing_indexes:
+            if other.name == index.name or other in redundant or not other.covers(index):
+                continue
+
+            # Of the two identical indexes, only one is reported
+            if len(other.columns) > len(index.columns) or other.unique or other.name < index.name:  # type: ignore
+                redundant[index] = other
+                break
+
+    return redundant
+
+
+def build_report(filter_classes: list[type[BaseFilter]], existing_indexes: list[IndexDefinition]) -> IndexReport:
+    report = IndexReport(redundant=get_redundant_indexes(existing_indexes))
+    required_indexes: dict[IndexDefinition, list[str]] = {}
+
+    for filter_class in filter_classes:
+        for index, reason in get_filter_indexes(filter_class):
+            if reason not in (reasons := required_indexes.setdefault(index, [])):
+                reasons.append(reason)
+
+    # Longer indexes go first, so the prefixes are folded into the composite indexes covering them
+    for index in sorted(required_indexes, key=lambda required_index: len(required_index.columns), reverse=True):
+        if any(existing.covers(index) for existing in existing_indexes):
+            continue
+
+        if covering := next((missing for missing in report.missing if missing.covers(index)), None):
+            report.missing[covering].extend(required_indexes[index])
+        else:
+            report.missing[index] = required_indexes[index]
+
+    return report
+
+
+def generate_migration(indexes: list[IndexDefinition], message: str, alembic_ini_path: str = ALEMBIC_INI_PATH) -> None:
+    """
+    Writes a new Alembic revision, which creates the indexes.
+
+    NOTE: The indexes are created with plain `CREATE INDEX`, which blocks writes to the table.
+    Consider `postgresql_concurrently=True` within `op.get_context().autocommit_block()` for big tables.
+    """
+
+    def process_revision_directives(_context: Any, _revision: Any, directives: list[ops.MigrationScript]) -> None:
+        script = directives[0]
+        upgrade_ops: list[ops.MigrateOperation] = []
+
+        if any(index.operator_class == TRIGRAM_OPERATOR_CLASS for index in indexes):
+            upgrade_ops.append(ops.ExecuteSQLOp("CREATE EXTENSION IF NOT EXISTS pg_trgm;"))
+
+        for index in indexes:
+            upgrade_ops.append(
+                ops.CreateIndexOp(
+                    index.index_name,
+                    index.table,
+                    list(index.columns),
+                    postgresql_using=index.using,
+                    **(
+                        {"postgresql_ops": {column: index.operator_class for column in index.columns}}
+                        if index.operator_class
+                        else {}
+                    ),
+                )
+            )
+
+        script.upgrade_ops.ops[:] = upgrade_ops
+        script.downgrade_ops.ops[:] = [
+            ops.DropIndexOp(index.index_name, table_name=index.table) for index in reversed(indexes)
+        ]
+
+    # The autogenerate mode is needed to render the operations, its own comparison of the models is replaced
+    command.revision(
+        Config(alembic_ini_path),
+        message=message,
+        autogenerate=True,
+        process_revision_directives=process_revision_directives,
+    )
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description="Compares the indexes required by the filters with the existing ones.")
+    parser.add_argument("--generate", action="store_true", help="Generate an Alembic revision with missing indexes.")
+    parser.add_argument("-m", "--message", default="add indexes for filters", help="Message of the revision.")
+    parser.add_argument("-c", "--config", default=ALEMBIC_INI_PATH, help="Path to the Alembic config.")
+    parser.add_argument("--module", default="app.main", help="Module, which imports all filter classes.")
+    args = parser.parse_args()
+
+    importlib.import_module(args.module)
+
+    try:
+        existing_indexes = await get_existing_indexes(engine)
+    finally:
+        await engine.dispose()
+
+    report = build_report(list(iter_filter_classes()), existing_indexes)
+
+    for index, reasons in report.missing.items():
+        log.warning("Missing index", index=index.index_name, columns=index.columns, using=index.using, reasons=reasons)
+
+    for index, covering in report.redundant.items():
+        log.warning("Redundant index", index=index.name, table=index.table, covered_by=covering.name)
+
+    log.info("Index advisor", missing=len(report.missing), redundant=len(report.redundant))
+
+    if args.generate and report.missing:
+        generate_migration(list(report.missing), args.message, args.config)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
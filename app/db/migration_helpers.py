@@ -1,6 +1,8 @@
 from alembic import op
 from sqlalchemy import text
 
+from app.core.helpers import get_search_vector_expression
+
 
 def table_has_column(table: str, column: str) -> bool:
     conn = op.get_bind()
@@ -68,3 +70,52 @@ def extension_exists(extension_name) -> bool:
     query_string = f"""SELECT EXISTS(SELECT 1 FROM pg_extension WHERE extname = '{extension_name}');"""
     result = conn.execute(text(query_string))
     return result.scalar_one()
+
+
+def create_extension(extension_name: str) -> None:
+    if not extension_exists(extension_name):
+        op.execute(f'CREATE EXTENSION IF NOT EXISTS "{extension_name}";')
+
+
+def add_search_vector_column(
+    table: str, columns: list[str], column: str = "search_vector", config: str = "simple"
+) -> None:
+    """
+    Adds a stored generated `tsvector` column for the full-text search of `BaseFilter`.
+
+    NOTE: Adding a stored generated column rewrites the table, run it in a maintenance window for big tables.
+    """
+    if table_has_column(table, column):
+        return
+
+    expression: str = get_search_vector_expression(columns, config)
+    op.execute(f"ALTER TABLE {table} ADD COLUMN {column} tsvector GENERATED ALWAYS AS ({expression}) STORED;")
+
+
+def create_search_vector_index(table: str, column: str = "search_vector", name: str | None = None) -> None:
+    name = name or f"ix_{table}_{column}"
+
+    if not index_exists(name):
+        op.create_index(name, table, [column], postgresql_using="gin")
+
+
+def create_trigram_index(table: str, column: str, name: str | None = None) -> None:
+    """
+    Creates a GIN trigram index, it backs the similarity operator (`%`) as well as `ILIKE '%value%'`.
+    """
+    name = name or f"ix_{table}_{column}_trgm"
+    create_extension("pg_trgm")
+
+    if not index_exists(name):
+        op.create_index(name, table, [column], postgresql_using="gin", postgresql_ops={column: "gin_trgm_ops"})
+
+
+def create_prefix_index(table: str, column: str, name: str | None = None) -> None:
+    """
+    Creates an index for the case-insensitive prefix search (`column__istartswith=abc`),
+    which is translated into `lower(column) LIKE 'abc%'` by the filters.
+    """
+    name = name or f"ix_{table}_{column}_lower_prefix"
+
+    if not index_exists(name):
+        op.execute(f"CREATE INDEX {name} ON {table} (lower({column}) text_pattern_ops);")
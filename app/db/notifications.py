@@ -0,0 +1,98 @@
+import asyncio
+from datetime import datetime
+from itertools import batched
+from typing import Any
+
+import orjson
+from pydantic_core import to_jsonable_python
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+
+from app.config import config, log
+from app.core.cache import Invalidation, entity_caches, invalidate_entity, result_caches, set_invalidation_publisher
+
+# Postgres limits the NOTIFY payload to 8000 bytes
+INVALIDATIONS_PER_NOTIFICATION: int = 50
+
+
+class CacheInvalidationListener:
+    """
+    Shares cache invalidations (entities and table write versions) between workers through Postgres LISTEN/NOTIFY.
+
+    Committed invalidations are published to the channel, and the invalidations from the channel are applied to
+    the local caches. The listener holds one dedicated connection, which is used for both LISTEN and NOTIFY.
+
+    :param engine: Engine to take the dedicated connection from.
+    :param channel: Name of the LISTEN/NOTIFY channel, all workers must use the same one.
+    """
+
+    def __init__(self, engine: AsyncEngine, channel: str):
+        self.engine = engine
+        self.channel = channel
+
+        self._connection: AsyncConnection | None = None
+        self._driver_connection: Any = None
+        self._lock = asyncio.Lock()
+        self._tasks: set[asyncio.Task] = set()
+
+    async def start(self) -> None:
+        self._connection = await self.engine.connect()
+        self._driver_connection = (await self._connection.get_raw_connection()).driver_connection
+
+        await self._driver_connection.add_listener(self.channel, self._on_notification)
+        self._driver_connection.add_termination_listener(self._on_termination)
+
+        set_invalidation_publisher(self.publish)
+        log.info("Cache invalidation listener started", channel=self.channel)
+
+    async def stop(self) -> None:
+        set_invalidation_publisher(None)
+
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+        if self._connection is not None:
+            await self._driver_connection.remove_listener(self.channel, self._on_notification)
+            await self._connection.close()
+            self._connection = self._driver_connection = None
+
+    def publish(self, invalidations: list[Invalidation]) -> None:
+        """
+        Schedules publishing of the committed invalidations, so the commit itself isn't delayed.
+        """
+        task = asyncio.get_running_loop().create_task(self._publish(invalidations))
+
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _publish(self, invalidations: list[Invalidation]) -> None:
+        try:
+            async with self._lock:
+                for chunk in batched(invalidations, INVALIDATIONS_PER_NOTIFICATION):
+                    payload: str = orjson.dumps(to_jsonable_python(chunk)).decode()
+                    await self._driver_connection.execute("SELECT pg_notify($1, $2)", self.channel, payload)
+
+        except Exception as exc:
+            log.error("Failed to publish cache invalidations", error=str(exc), channel=self.channel)
+
+    def _on_notification(self, _connection: Any, _pid: int, _channel: str, payload: str) -> None:
+        for table_name, obj_id, version in orjson.loads(payload):
+            invalidate_entity(table_name, obj_id, datetime.fromisoformat(version) if version else None)
+
+    def _on_termination(self, _connection: Any) -> None:
+        # Invalidations from other workers can't be received anymore, so nothing cached can be trusted
+        for caches in entity_caches.values():
+            for cache in caches:
+                cache.clear()
+
+        for result_cache in result_caches.values():
+            result_cache.clear()
+
+        set_invalidation_publisher(None)
+        log.error("Cache invalidation listener connection is lost", channel=self.channel)
+
+
+def get_cache_invalidation_listener(engine: AsyncEngine) -> CacheInvalidationListener | None:
+    if not config.cache.invalidation_channel:
+        return None
+
+    return CacheInvalidationListener(engine, config.cache.invalidation_channel)
@@ -0,0 +1,151 @@
+"""
+Connection pool telemetry.
+
+`InstrumentedAsyncAdaptedQueuePool` measures how long every checkout waited for a connection, the rest is collected
+from the pool events: connection age at checkout, new connections and invalidations. Gauges (checked out, idle,
+overflow) are read from the pool when the stats are requested, see `get_pool_stats`.
+"""
+
+from bisect import bisect_left
+from time import perf_counter, time
+from typing import Any, Sequence
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, ConnectionPoolEntry
+
+from app.config import config, log
+
+CHECKOUT_WAIT_KEY: str = "checkout_wait"
+
+# Upper bounds of the histogram buckets in seconds
+CHECKOUT_WAIT_BUCKETS: tuple[float, ...] = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+CONNECTION_AGE_BUCKETS: tuple[float, ...] = (1, 10, 60, 300, 900, 1800, 3600, 7200)
+
+
+class Histogram:
+    """
+    Histogram with fixed buckets, the snapshot has cumulative counts like Prometheus histograms.
+
+    :param buckets: Sorted upper bounds of the buckets.
+    """
+
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = tuple(buckets)
+        self.counts: list[int] = [0] * (len(self.buckets) + 1)
+        self.count: int = 0
+        self.sum: float = 0.0
+        self.max: float = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+
+    def snapshot(self) -> dict[str, Any]:
+        cumulative: int = 0
+        buckets: dict[str, int] = {}
+
+        for bound, bucket_count in zip([*map(str, self.buckets), "+Inf"], self.counts):
+            cumulative += bucket_count
+            buckets[bound] = cumulative
+
+        return {"count": self.count, "sum": round(self.sum, 6), "max": round(self.max, 6), "buckets": buckets}
+
+
+class PoolStats:
+    """
+    Telemetry of a single connection pool.
+    """
+
+    def __init__(self, engine: AsyncEngine, name: str):
+        self.engine = engine
+        self.name = name
+
+        self.checkout_wait = Histogram(CHECKOUT_WAIT_BUCKETS)
+        self.connection_age = Histogram(CONNECTION_AGE_BUCKETS)
+        self.connects: int = 0
+        self.invalidations: int = 0
+        self.soft_invalidations: int = 0
+        self.slow_checkouts: int = 0
+
+    def get_gauges(self) -> dict[str, int]:
+        pool = self.engine.sync_engine.pool
+
+        return {
+            "size": pool.size(),  # type: ignore[attr-defined]
+            "checked_out": pool.checkedout(),  # type: ignore[attr-defined]
+            "idle": pool.checkedin(),  # type: ignore[attr-defined]
+            "overflow": max(pool.overflow(), 0),  # type: ignore[attr-defined]
+        }
+
+    def on_connect(self, _dbapi_connection: Any, _record: ConnectionPoolEntry) -> None:
+        self.connects += 1
+
+    def on_checkout(self, _dbapi_connection: Any, record: ConnectionPoolEntry, _proxy: Any) -> None:
+        self.connection_age.observe(time() - record.starttime)  # type: ignore[attr-defined]
+
+        if (wait := record.info.pop(CHECKOUT_WAIT_KEY, None)) is None:
+            return
+
+        self.checkout_wait.observe(wait)
+
+        if wait >= config.db.pool_checkout_warning_threshold:
+            self.slow_checkouts += 1
+            log.warning("Slow connection checkout", pool=self.name, wait=round(wait, 4), **self.get_gauges())
+
+    def on_invalidate(self, _dbapi_connection: Any, _record: ConnectionPoolEntry, _exception: Any) -> None:
+        self.invalidations += 1
+
+    def on_soft_invalidate(self, _dbapi_connection: Any, _record: ConnectionPoolEntry, _exception: Any) -> None:
+        self.soft_invalidations += 1
+
+    def snapshot(self) -> dict[str, Any]:
+        return self.get_gauges() | {
+            "connects": self.connects,
+            "invalidations": self.invalidations,
+            "soft_invalidations": self.soft_invalidations,
+            "slow_checkouts": self.slow_checkouts,
+            "checkout_wait": self.checkout_wait.snapshot(),
+            "connection_age": self.connection_age.snapshot(),
+        }
+
+
+class InstrumentedAsyncAdaptedQueuePool(AsyncAdaptedQueuePool):
+    """
+    Pool which stores the time spent waiting for a connection in the connection record,
+    so the `checkout` event can report it.
+    """
+
+    def _do_get(self) -> ConnectionPoolEntry:
+        started_at: float = perf_counter()
+        record = super()._do_get()
+        record.info[CHECKOUT_WAIT_KEY] = perf_counter() - started_at
+
+        return record
+
+
+# Registry of the instrumented pools by their names
+pool_stats: dict[str, PoolStats] = {}
+
+
+def instrument_pool(engine: AsyncEngine, name: str) -> PoolStats:
+    """
+    Subscribes the telemetry to the pool events of the engine. The listeners are kept when the pool is recreated.
+
+    :param engine: Engine created with `poolclass=InstrumentedAsyncAdaptedQueuePool`.
+    :param name: Name of the pool in the stats and logs.
+    """
+    stats = pool_stats[name] = PoolStats(engine, name)
+
+    event.listen(engine.sync_engine, "connect", stats.on_connect)
+    event.listen(engine.sync_engine, "checkout", stats.on_checkout)
+    event.listen(engine.sync_engine, "invalidate", stats.on_invalidate)
+    event.listen(engine.sync_engine, "soft_invalidate", stats.on_soft_invalidate)
+
+    return stats
+
+
+def get_pool_stats() -> dict[str, dict[str, Any]]:
+    return {name: stats.snapshot() for name, stats in pool_stats.items()}
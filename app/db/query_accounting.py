@@ -0,0 +1,121 @@
+"""
+Per-request query accounting.
+
+Statements, fetched/affected rows and DB time are collected by the engine events into the `QueryStats`
+of the current request (see `QueryAccountingMiddleware`). The same statement executed many times within one
+request is a typical symptom of N+1 lazy loading, so such statements are reported along with the exceeded budget.
+"""
+
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from time import perf_counter
+from typing import Any, Iterator
+
+from sqlalchemy import Engine, event
+
+from app.config import config, log
+from app.core.enums import AppEnvEnum
+
+QUERY_STARTED_AT_KEY: str = "query_started_at"
+
+
+class QueryBudgetExceededError(Exception):
+    """
+    The request has executed more statements than allowed, or repeated the same statement too many times.
+    It's raised in the test environment only, otherwise the violation is logged.
+    """
+
+
+@dataclass(slots=True)
+class QueryStats:
+    statements: int = 0
+    rows: int = 0
+    duration: float = 0.0
+    shapes: Counter[str] = field(default_factory=Counter)
+
+    def record(self, statement: str, rows: int, duration: float) -> None:
+        self.statements += 1
+        self.rows += rows
+        self.duration += duration
+        self.shapes[statement] += 1
+
+    def get_repeated_statements(self, threshold: int) -> dict[str, int]:
+        """
+        Returns the statements, which were executed at least `threshold` times, i.e. likely N+1 queries.
+        """
+        return {statement: count for statement, count in self.shapes.most_common() if count >= threshold}
+
+
+_query_stats: ContextVar[QueryStats | None] = ContextVar("query_stats", default=None)
+
+
+def get_query_stats() -> QueryStats | None:
+    return _query_stats.get()
+
+
+@contextmanager
+def track_queries() -> Iterator[QueryStats]:
+    """
+    Collects the stats of all statements executed within the block.
+    """
+    token = _query_stats.set(stats := QueryStats())
+
+    try:
+        yield stats
+    finally:
+        _query_stats.reset(token)
+
+
+def check_query_budget(stats: QueryStats, **log_context: Any) -> None:
+    """
+    Reports the statements over the budget and the likely N+1 queries.
+
+    :raises QueryBudgetExceededError: If a violation is found in the test environment.
+    """
+    repeated_statements = stats.get_repeated_statements(config.query.n_plus_one_threshold)
+    over_budget: bool = (
+        config.query.max_statements_per_request is not None
+        and stats.statements > config.query.max_statements_per_request
+    )
+
+    if not repeated_statements and not over_budget:
+        return
+
+    message: str = "Likely N+1 queries" if repeated_statements else "Query budget is exceeded"
+    details: dict[str, Any] = {
+        "statements": stats.statements,
+        "budget": config.query.max_statements_per_request,
+        "repeated_statements": repeated_statements,
+        **log_context,
+    }
+
+    if config.environment == AppEnvEnum.TEST:
+        raise QueryBudgetExceededError(f"{message}: {details}")
+
+    log.warning(message, **details)
+
+
+def get_query_duration(context: Any) -> float | None:
+    """
+    Returns the duration of the statement in seconds, it's available in the `after_cursor_execute` event.
+    """
+    if (started_at := getattr(context, QUERY_STARTED_AT_KEY, None)) is None:
+        return None
+
+    return perf_counter() - started_at
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _start_query_timer(_conn: Any, _cursor: Any, _statement: str, _parameters: Any, context: Any, *_: Any) -> None:
+    if context is not None:
+        setattr(context, QUERY_STARTED_AT_KEY, perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _record_query(_conn: Any, cursor: Any, statement: str, _parameters: Any, context: Any, *_: Any) -> None:
+    if (stats := _query_stats.get()) is None or (duration := get_query_duration(context)) is None:
+        return
+
+    stats.record(statement, max(cursor.rowcount, 0), duration)
@@ -0,0 +1,72 @@
+"""
+Routing of read-only statements to the read replicas.
+
+`RoutingSession` sends plain SELECT statements to a replica and everything else to the primary. As soon as
+the session writes (DML, flush or `SELECT ... FOR UPDATE`), it's pinned to the primary for the rest of its
+lifetime, so the reads after a write see the written data even if the replicas lag behind (read-your-writes).
+Sessions are request-scoped, so the pinning never outlives the request.
+"""
+
+from itertools import count
+from typing import Any, Sequence
+
+from sqlalchemy import Engine, Select
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.dml import UpdateBase
+
+from app.core.enums import ReplicaRoutingEnum
+
+PRIMARY_PINNED_KEY: str = "primary_pinned"
+REPLICA_KEY: str = "replica"
+
+
+class ReplicaRouter:
+    """
+    Chooses a replica engine for a session.
+
+    :param engines: Engines of the read replicas.
+    :param routing: Strategy of choosing a replica: round-robin, or the least number of checked out connections.
+    """
+
+    def __init__(self, engines: Sequence[Engine], routing: ReplicaRoutingEnum = ReplicaRoutingEnum.ROUND_ROBIN):
+        self.engines = list(engines)
+        self.routing = routing
+        self._counter = count()
+
+    def choose(self) -> Engine:
+        if self.routing == ReplicaRoutingEnum.LEAST_CONNECTIONS:
+            return min(self.engines, key=lambda engine: engine.pool.checkedout())  # type: ignore[attr-defined]
+
+        return self.engines[next(self._counter) % len(self.engines)]
+
+
+class RoutingSession(Session):
+    """
+    Session which sends read-only statements to the read replicas.
+
+    :param replica_router: Router of the replicas. If None, all statements are sent to the primary.
+    """
+
+    def __init__(self, *args: Any, replica_router: ReplicaRouter | None = None, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self.replica_router = replica_router
+
+    def get_bind(self, mapper: Any = None, *, clause: Any = None, **kwargs: Any) -> Any:
+        primary = super().get_bind(mapper, clause=clause, **kwargs)
+
+        if self.replica_router is None or self.info.get(PRIMARY_PINNED_KEY):
+            return primary
+
+        if self._flushing or isinstance(clause, UpdateBase) or getattr(clause, "_for_update_arg", None) is not None:
+            self.info[PRIMARY_PINNED_KEY] = True
+            return primary
+
+        # Textual SQL and other constructs may have side effects, so only SELECT statements are routed
+        if not isinstance(clause, Select):
+            return primary
+
+        # The replica is kept for the whole session, so consecutive reads see the same replication state
+        if (replica := self.info.get(REPLICA_KEY)) is None:
+            replica = self.info[REPLICA_KEY] = self.replica_router.choose()
+
+        return replica
@@ -0,0 +1,95 @@
+"""
+Slow query log.
+
+Statements, which run longer than `QUERY_SLOW_THRESHOLD` seconds, are logged with their duration and parameters.
+The parameters are redacted in production, like the details of the database errors (see `raise_db_error`).
+
+A sample of the slow SELECT statements (`QUERY_EXPLAIN_SAMPLE_RATE`) is re-run in a background task with
+`EXPLAIN (ANALYZE, BUFFERS)`, and the plan is attached to the log entry. Only SELECT statements are explained,
+because ANALYZE executes the statement.
+"""
+
+import asyncio
+import random
+from contextvars import Context
+from typing import Any
+
+import orjson
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.config import config, log
+from app.core.enums import AppEnvEnum
+from app.db.query_accounting import get_query_duration
+
+# Upper bound of the EXPLAIN statements running at once, the rest of the sampled statements are logged without plans
+MAX_CONCURRENT_EXPLAINS: int = 2
+
+
+class SlowQueryLog:
+    """
+    Logs slow statements of the engine, and captures the plans of a sample of them.
+
+    :param engine: Engine to watch, the plans are captured with a separate connection of the same engine.
+    """
+
+    def __init__(self, engine: AsyncEngine):
+        self.engine = engine
+        self._tasks: set[asyncio.Task] = set()
+
+    def on_after_cursor_execute(
+        self, _conn: Any, _cursor: Any, statement: str, parameters: Any, context: Any, executemany: bool
+    ) -> None:
+        if config.query.slow_threshold is None or (duration := get_query_duration(context)) is None:
+            return
+
+        # Plans captured by the log itself are slow by definition
+        if duration < config.query.slow_threshold or statement.startswith("EXPLAIN"):
+            return
+
+        entry: dict[str, Any] = {
+            "statement": statement,
+            "parameters": repr(parameters) if config.environment != AppEnvEnum.PRODUCTION else "<redacted>",
+            "duration": round(duration, 4),
+            "database": self.engine.url.host,
+        }
+
+        if not executemany and self._should_explain(statement):
+            # The plan is captured out of the request, so none of the request context (e.g. deadline) is inherited
+            task = asyncio.get_running_loop().create_task(
+                self._explain(statement, parameters, entry), context=Context()
+            )
+
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+            return
+
+        log.warning("Slow query", **entry)
+
+    def _should_explain(self, statement: str) -> bool:
+        return (
+            len(self._tasks) < MAX_CONCURRENT_EXPLAINS
+            and statement.lstrip()[:6].upper() == "SELECT"
+            and random.random() < config.query.explain_sample_rate
+        )
+
+    async def _explain(self, statement: str, parameters: Any, entry: dict[str, Any]) -> None:
+        try:
+            async with self.engine.connect() as connection:
+                plan: Any = (
+                    await connection.exec_driver_sql(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {statement}", parameters)
+                ).scalar()
+
+            entry["plan"] = orjson.loads(plan) if isinstance(plan, str) else plan
+
+        except Exception as exc:
+            entry["explain_error"] = str(exc)
+
+        log.warning("Slow query", **entry)
+
+
+def instrument_slow_queries(engine: AsyncEngine) -> SlowQueryLog:
+    slow_query_log = SlowQueryLog(engine)
+    event.listen(engine.sync_engine, "after_cursor_execute", slow_query_log.on_after_cursor_execute)
+
+    return slow_query_log
@@ -0,0 +1,41 @@
+"""
+Counters of the SQLAlchemy compiled statements cache.
+
+Every executed statement is either taken from the compiled cache of the engine (hit), compiled and put into
+the cache (miss), or compiled without caching at all (e.g. textual SQL or constructs without a cache key).
+In the steady state almost all repository statements must be hits.
+"""
+
+from typing import Any
+
+from sqlalchemy import Engine, event
+from sqlalchemy.engine.interfaces import CacheStats
+
+from app.config import config
+
+_counters: dict[str, int] = {"hits": 0, "misses": 0, "uncached": 0}
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _count_compiled_cache_usage(
+    _conn: Any, _cursor: Any, _statement: str, _parameters: Any, context: Any, _executemany: bool
+) -> None:
+    if context is None:
+        return
+
+    if context.cache_hit is CacheStats.CACHE_HIT:
+        _counters["hits"] += 1
+    elif context.cache_hit is CacheStats.CACHE_MISS:
+        _counters["misses"] += 1
+    else:
+        _counters["uncached"] += 1
+
+
+def get_statement_cache_stats() -> dict[str, int | float]:
+    cached: int = _counters["hits"] + _counters["misses"]
+
+    return _counters | {
+        "hit_ratio": round(_counters["hits"] / cached, 4) if cached else 0.0,
+        "query_cache_size": config.db.query_cache_size,
+        "prepared_statement_cache_size": config.db.prepared_statement_cache_size,
+    }
@@ -0,0 +1,117 @@
+"""
+Early release of the pooled connections.
+
+A session checks out a connection on its first query and holds it until the transaction ends. Reads begin
+a transaction implicitly (autobegin), which would otherwise last until the session is closed at the end of
+the request, including the serialization of the response. `release_connection` commits such read-only
+transactions right after the repository reads, so the connection goes back to the pool until the next query.
+"""
+
+from functools import wraps
+from typing import Awaitable, Callable, ParamSpec, TypeVar
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import ORMExecuteState, Session, SessionTransaction, SessionTransactionOrigin
+from sqlalchemy.sql.elements import TextClause
+
+from app.config import config
+
+P = ParamSpec("P")
+T = TypeVar("T")
+
+HAS_WRITES_KEY: str = "transaction_has_writes"
+UNIT_OF_WORK_KEY: str = "unit_of_work"
+ACTIVE_READS_KEY: str = "active_reads"
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _track_writes(orm_execute_state: ORMExecuteState) -> None:
+    # Textual SQL may modify data as well, so it's treated as a write. `SELECT ... FOR UPDATE` is treated as a write
+    # too, otherwise the transaction would be committed right after the read and release the row locks.
+    if (
+        orm_execute_state.is_insert
+        or orm_execute_state.is_update
+        or orm_execute_state.is_delete
+        or isinstance(orm_execute_state.statement, TextClause)
+        or getattr(orm_execute_state.statement, "_for_update_arg", None) is not None
+    ):
+        orm_execute_state.session.info[HAS_WRITES_KEY] = True
+
+
+@event.listens_for(Session, "after_flush")
+def _track_flush(session: Session, _flush_context: object) -> None:
+    session.info[HAS_WRITES_KEY] = True
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _reset_writes(session: Session, transaction: SessionTransaction) -> None:
+    if transaction.parent is None:
+        session.info.pop(HAS_WRITES_KEY, None)
+
+
+def has_writes(session: Session) -> bool:
+    """
+    Flag which shows that the current transaction of the session has modified data.
+    """
+    return bool(session.info.get(HAS_WRITES_KEY))
+
+
+def in_unit_of_work(session: AsyncSession | Session) -> bool:
+    """
+    Flag which shows that the session is used within a unit of work, so the commit is deferred to its end.
+    """
+    return UNIT_OF_WORK_KEY in session.info
+
+
+async def release_connection(session: AsyncSession) -> None:
+    """
+    Ends the implicitly begun transaction, if it has only read data, so the connection is returned to the pool.
+
+    The transaction is committed rather than rolled back, so the loaded objects aren't expired. Transactions,
+    which were begun explicitly, have savepoints, writes or pending changes, are left untouched.
+    """
+    if not config.db.release_idle_connections:
+        return
+
+    transaction = session.sync_session.get_transaction()
+
+    if (
+        transaction is None
+        or transaction.origin is not SessionTransactionOrigin.AUTOBEGIN
+        or session.in_nested_transaction()
+        or in_unit_of_work(session)
+        or has_writes(session.sync_session)
+        or session.new
+        or session.dirty
+        or session.deleted
+    ):
+        return
+
+    await session.commit()
+
+
+def releases_connection(method: Callable[P, Awaitable[T]]) -> Callable[P, Awaitable[T]]:
+    """
+    Decorator of the repository read methods, which releases the connection after the method succeeds.
+
+    Reads running concurrently on the same session (e.g. `get` calls coalesced by `EntityLoader` within
+    `asyncio.gather`) are counted, and the connection is released once, after the last of them finishes.
+    """
+
+    @wraps(method)
+    async def wrapper(*args: P.args, **kwargs: P.kwargs) -> T:
+        session: AsyncSession = args[0].session  # type: ignore[attr-defined]
+        session.info[ACTIVE_READS_KEY] = session.info.get(ACTIVE_READS_KEY, 0) + 1
+
+        try:
+            result = await method(*args, **kwargs)
+        finally:
+            session.info[ACTIVE_READS_KEY] -= 1
+
+        if not session.info[ACTIVE_READS_KEY]:
+            await release_connection(session)
+
+        return result
+
+    return wrapper
@@ -1,3 +1,6 @@
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
 from fastapi import FastAPI
 from fastapi_pagination import add_pagination
 
@@ -5,6 +8,19 @@ from app.api import init_routers
 from app.config import config
 from app.core.exceptions import exception_handlers
 from app.core.middlewares import init_middlewares
+from app.db.engine import engine
+from app.db.notifications import get_cache_invalidation_listener
+
+
+@asynccontextmanager
+async def lifespan(_: FastAPI) -> AsyncIterator[None]:
+    if (cache_invalidation_listener := get_cache_invalidation_listener(engine)) is not None:
+        await cache_invalidation_listener.start()
+
+    yield
+
+    if cache_invalidation_listener is not None:
+        await cache_invalidation_listener.stop()
 
 
 def _initialize_app() -> FastAPI:
@@ -13,6 +29,7 @@ def _initialize_app() -> FastAPI:
         exception_handlers=exception_handlers,
         debug=config.debug,
         docs_url=config.docs_url,
+        lifespan=lifespan,
     )
 
     init_routers(_app)
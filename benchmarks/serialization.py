@@ -0,0 +1,115 @@
+"""
+Benchmark of the response serialization: FastAPI `response_model` + `ORJSONResponse` against `SerializedResponse`.
+
+    python -m benchmarks.serialization --items 1000 --repeat 50
+"""
+
+import argparse
+import asyncio
+import uuid
+from datetime import UTC, datetime
+from decimal import Decimal
+from time import perf_counter
+from typing import Any, Awaitable, Callable
+
+import orjson
+from fastapi.responses import ORJSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+from fastapi_pagination import Params
+from pydantic import Field
+from sqlalchemy import DECIMAL, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.api.serialization import SerializedResponse
+from app.config import log
+from app.core.models import Base, CommonMixin
+from app.core.pagination import Page
+from app.core.schemas.base import BaseSchema
+
+
+class BenchmarkItem(CommonMixin, Base):
+    id: Mapped[uuid.UUID] = mapped_column(primary_key=True, default=uuid.uuid4)
+    name: Mapped[str] = mapped_column(String)
+    description: Mapped[str | None] = mapped_column(String)
+    price: Mapped[Decimal] = mapped_column(DECIMAL(10, 2))
+
+
+class BenchmarkItemDetail(BaseSchema):
+    id: uuid.UUID
+    name: str
+    description: str | None
+    # Aliased field, which is read from the attribute by its name
+    price: Decimal = Field(alias="itemPrice")
+    created_at: datetime
+    updated_at: datetime | None
+    # Field without an attribute, which falls back to the default
+    score: int = 0
+
+
+def build_items(count: int) -> list[BenchmarkItem]:
+    now = datetime.now(UTC)
+
+    return [
+        BenchmarkItem(
+            id=uuid.uuid4(),
+            name=f"Item #{index}",
+            description="Lorem ipsum dolor sit amet" if index % 2 else None,
+            price=Decimal(index) / 100,
+            created_at=now,
+            updated_at=now,
+        )
+        for index in range(count)
+    ]
+
+
+async def measure(name: str, render: Callable[[], Awaitable[bytes]], repeat: int) -> bytes:
+    body: bytes = await render()  # warm-up, builds the validators and serializers
+    started_at: float = perf_counter()
+
+    for _ in range(repeat):
+        await render()
+
+    log.info("Serialization", path=name, ms_per_response=round((perf_counter() - started_at) / repeat * 1000, 3))
+
+    return body
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description="Compares the response serialization paths.")
+    parser.add_argument("--items", type=int, default=1000, help="Number of items of the page.")
+    parser.add_argument("--repeat", type=int, default=50, help="Number of serializations per path.")
+    args = parser.parse_args()
+
+    items = build_items(args.items)
+    page_schema: Any = Page[BenchmarkItemDetail]
+    params = Params.model_construct(page=1, size=args.items)
+    page = Page[Any].create(items, params=params, total=args.items, has_next=False)
+
+    # Pages created with the response schema (`add_pagination`) hold the validated items already
+    validated_page = page_schema.create(items, params=params, total=args.items, has_next=False)
+
+    cases: list[tuple[str, Any, Any]] = [
+        ("object", items[0], BenchmarkItemDetail),
+        ("page", page, page_schema),
+        ("validated page", validated_page, page_schema),
+    ]
+
+    for case, content, schema in cases:
+        response_field = create_model_field(name="Response", type_=schema, mode="serialization")
+
+        async def render_fastapi() -> bytes:
+            return ORJSONResponse(await serialize_response(field=response_field, response_content=content)).body
+
+        async def render_serialized() -> bytes:
+            return SerializedResponse(content, schema).body
+
+        fastapi_body = await measure(f"{case}: response_model + ORJSONResponse", render_fastapi, args.repeat)
+        serialized_body = await measure(f"{case}: SerializedResponse", render_serialized, args.repeat)
+
+        if orjson.loads(fastapi_body) != orjson.loads(serialized_body):
+            log.warning("Serialization paths produce different bodies", case=case)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
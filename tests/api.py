@@ -0,0 +1,38 @@
+from typing import Annotated
+
+from fastapi import APIRouter, Depends
+from fastapi_filter import FilterDepends
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.conditional import ConditionalGet
+from app.api.serialization import SerializedResponse
+from app.core.dependencies import get_db_session
+from app.core.pagination import Page, get_page_version
+from tests.models import AuthorDetail, AuthorFilter, AuthorRepository
+
+authors_router = APIRouter(prefix="/authors")
+
+
+@authors_router.get("", response_model=Page[AuthorDetail])
+async def get_authors(
+    session: Annotated[AsyncSession, Depends(get_db_session)],
+    query_filter: Annotated[AuthorFilter, FilterDepends(AuthorFilter)],
+):
+    page = await AuthorRepository(session).get_all(query_filter)
+
+    return SerializedResponse(page, type(page))
+
+
+@authors_router.get("/conditional", response_model=Page[AuthorDetail])
+async def get_authors_conditionally(
+    session: Annotated[AsyncSession, Depends(get_db_session)],
+    conditional: Annotated[ConditionalGet, Depends()],
+):
+    repository = AuthorRepository(session)
+
+    if conditional.if_none_match and conditional.is_not_modified(await repository.get_all_version()):
+        return conditional.not_modified()
+
+    page = await repository.get_all()
+
+    return SerializedResponse(page, Page[AuthorDetail], headers=conditional.get_headers(get_page_version(page)))
@@ -0,0 +1,88 @@
+"""
+The tests run against an in-memory SQLite database, so only the dialect-agnostic behaviour is covered here.
+"""
+
+from typing import AsyncIterator
+
+import pytest
+from fastapi import FastAPI
+from fastapi_pagination import add_pagination
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+
+from app.core.dependencies import get_db_session
+from app.core.models import Base
+from tests.api import authors_router
+from tests.models import Author, Book
+
+
+@pytest.fixture
+async def engine() -> AsyncIterator[AsyncEngine]:
+    _engine = create_async_engine("sqlite+aiosqlite://")
+
+    async with _engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all, tables=[Author.__table__, Book.__table__])
+
+    yield _engine
+
+    await _engine.dispose()
+
+
+@pytest.fixture
+def statements(engine: AsyncEngine) -> list[str]:
+    """
+    SQL statements executed by the engine during the test.
+    """
+    executed: list[str] = []
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def _collect(_connection, _cursor, statement, *_) -> None:
+        executed.append(statement)
+
+    return executed
+
+
+@pytest.fixture
+def session_factory(engine: AsyncEngine) -> async_sessionmaker[AsyncSession]:
+    return async_sessionmaker(engine, expire_on_commit=False)
+
+
+@pytest.fixture
+async def session(session_factory: async_sessionmaker[AsyncSession]) -> AsyncIterator[AsyncSession]:
+    async with session_factory() as _session:
+        yield _session
+
+
+@pytest.fixture
+async def authors(session_factory: async_sessionmaker[AsyncSession]) -> list[Author]:
+    async with session_factory() as _session:
+        _authors = [
+            Author(name="Ursula", country="US", books=[Book(title="Earthsea")]),
+            Author(name="Stanislaw", country="PL", books=[Book(title="Solaris")]),
+            Author(name="Strugatsky", country=None, books=[]),
+        ]
+        _session.add_all(_authors)
+        await _session.commit()
+
+    return _authors
+
+
+@pytest.fixture
+def app(session_factory: async_sessionmaker[AsyncSession]) -> FastAPI:
+    async def get_test_db_session() -> AsyncIterator[AsyncSession]:
+        async with session_factory() as _session:
+            yield _session
+
+    _app = FastAPI()
+    _app.include_router(authors_router)
+    _app.dependency_overrides[get_db_session] = get_test_db_session
+    add_pagination(_app)
+
+    return _app
+
+
+@pytest.fixture
+async def client(app: FastAPI) -> AsyncIterator[AsyncClient]:
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as _client:
+        yield _client
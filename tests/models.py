@@ -0,0 +1,63 @@
+from sqlalchemy import ForeignKey, Select, String, bindparam, select
+from sqlalchemy.orm import Mapped, mapped_column, relationship, selectinload
+
+from app.core.filters import BaseFilter
+from app.core.models import Base, CommonMixin
+from app.core.repositories import CRUDRepository
+from app.core.schemas.base import BaseSchema
+
+
+class Author(CommonMixin, Base):
+    name: Mapped[str] = mapped_column(String)
+    country: Mapped[str | None] = mapped_column(String)
+
+    books: Mapped[list["Book"]] = relationship(back_populates="author")
+
+
+class Book(CommonMixin, Base):
+    title: Mapped[str] = mapped_column(String)
+    author_id: Mapped[int] = mapped_column(ForeignKey("author.id"))
+
+    author: Mapped[Author] = relationship(back_populates="books")
+
+
+class AuthorDetail(BaseSchema):
+    id: int
+    name: str
+    country: str | None
+
+
+class AuthorRepository(CRUDRepository[Author, AuthorDetail, AuthorDetail, AuthorDetail]):
+    sql_model: Author = Author
+
+    def _get_ids_query(self) -> Select:
+        # SQLite has no arrays, so the IDs are expanded into `IN (...)`
+        return self.get_query().where(Author.id.in_(bindparam("obj_ids", expanding=True)))
+
+
+class AuthorWithBooksRepository(AuthorRepository):
+    def get_query(self) -> Select:
+        return select(Author).options(selectinload(Author.books))
+
+
+class BookRepository(CRUDRepository[Book, BaseSchema, BaseSchema, BaseSchema]):
+    sql_model: Book = Book
+
+
+class BookFilter(BaseFilter):
+    title: str | None = None
+
+    class Constants(BaseFilter.Constants):
+        model = Book
+
+
+class AuthorFilter(BaseFilter):
+    name: str | None = None
+    name__istartswith: str | None = None
+    name__startswith: str | None = None
+    books: BookFilter | None = None
+    fields: list[str] | None = None
+    order_by: list[str] | None = ["id"]
+
+    class Constants(BaseFilter.Constants):
+        model = Author
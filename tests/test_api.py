@@ -0,0 +1,55 @@
+from datetime import timedelta
+
+from httpx import AsyncClient
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from tests.models import Author
+
+
+async def test_get_all_sparse_fieldset(client: AsyncClient, authors: list[Author]):
+    response = await client.get("/authors", params={"fields": "name"})
+
+    assert response.status_code == 200
+    assert response.json()["items"] == [{"id": author.id, "name": author.name} for author in authors]
+
+
+async def test_get_all_without_fieldset(client: AsyncClient, authors: list[Author]):
+    response = await client.get("/authors")
+
+    assert response.status_code == 200
+    assert set(response.json()["items"][0]) == {"id", "name", "country"}
+
+
+async def test_conditional_get_all(
+    client: AsyncClient,
+    session_factory: async_sessionmaker[AsyncSession],
+    authors: list[Author],
+    statements: list[str],
+):
+    statements.clear()
+    response = await client.get("/authors/conditional")
+
+    assert response.status_code == 200
+    assert len(statements) == 1
+
+    etag: str = response.headers["ETag"]
+    statements.clear()
+    response = await client.get("/authors/conditional", headers={"If-None-Match": etag})
+
+    assert response.status_code == 304
+    assert response.headers["ETag"] == etag
+    assert len(statements) == 1
+    assert "author.name" not in statements[0]
+
+    async with session_factory() as session:
+        # SQLite timestamps have a resolution of a second, so the update is moved forward explicitly
+        updated_at = authors[0].created_at + timedelta(seconds=1)
+        stmt = update(Author).where(Author.id == authors[0].id).values(name="Le Guin", updated_at=updated_at)
+        await session.execute(stmt)
+        await session.commit()
+
+    response = await client.get("/authors/conditional", headers={"If-None-Match": etag})
+
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
@@ -0,0 +1,41 @@
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from tests.models import Author, AuthorFilter, AuthorRepository, Book, BookFilter
+
+
+class AuthorJoinedBooksRepository(AuthorRepository):
+    def get_query(self):
+        return select(Author).join(Book)
+
+
+async def test_nested_filter_reuses_join_of_get_query(session: AsyncSession, authors: list[Author]):
+    query_filter = AuthorFilter(books=BookFilter(title="Solaris"))
+    stmt = query_filter.filter(AuthorJoinedBooksRepository(session).get_query())
+
+    assert str(stmt).count("JOIN book") == 1
+    assert [author.name for author in (await session.scalars(stmt)).all()] == ["Stanislaw"]
+
+
+async def test_nested_filter_joins_relation(session: AsyncSession, authors: list[Author]):
+    stmt = AuthorFilter(books=BookFilter(title="Earthsea")).filter(select(Author))
+
+    assert str(stmt).count("JOIN book") == 1
+    assert [author.name for author in (await session.scalars(stmt)).all()] == ["Ursula"]
+
+
+async def test_istartswith_filter(session: AsyncSession, authors: list[Author]):
+    stmt = AuthorFilter(name__istartswith="ST").filter(select(Author).order_by(Author.id))
+
+    assert "lower(author.name) LIKE" in str(stmt)
+    assert stmt.compile(compile_kwargs={"literal_binds": True}).string.count("'st%'") == 1
+    assert [author.name for author in (await session.scalars(stmt)).all()] == ["Stanislaw", "Strugatsky"]
+
+
+async def test_startswith_filter_matches_wildcards_literally(session: AsyncSession, authors: list[Author]):
+    session.add(Author(name="St_ar"))
+    await session.flush()
+
+    stmt = AuthorFilter(name__startswith="St_").filter(select(Author))
+
+    assert [author.name for author in (await session.scalars(stmt)).all()] == ["St_ar"]
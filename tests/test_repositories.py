@@ -0,0 +1,54 @@
+from fastapi_pagination import Params
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.cache import EntityCache, ResultCache
+from tests.models import Author, AuthorFilter, AuthorRepository, AuthorWithBooksRepository
+
+
+class CachedAuthorRepository(AuthorRepository):
+    result_cache = ResultCache()
+
+
+class OtherAuthorFilter(AuthorFilter):
+    class Constants(AuthorFilter.Constants):
+        ordering_field_name = "sort"
+
+
+def test_result_cache_key_includes_filter_class(session: AsyncSession):
+    repository = CachedAuthorRepository(session)
+    params = Params(page=1, size=10)
+
+    assert repository._get_result_cache_key(
+        AuthorFilter(name="Ursula"), params, False, None
+    ) != repository._get_result_cache_key(OtherAuthorFilter(name="Ursula"), params, False, None)
+
+
+class CachedAuthorWithBooksRepository(AuthorWithBooksRepository):
+    entity_cache = EntityCache()
+
+
+async def test_entity_cache_keeps_relationships_of_get_query(
+    session_factory: async_sessionmaker[AsyncSession], authors: list[Author]
+):
+    for _ in range(2):
+        async with session_factory() as session:
+            author = await CachedAuthorWithBooksRepository(session).get(authors[0].id)
+
+            assert [book.title for book in author.books] == ["Earthsea"]
+
+
+async def test_entity_cache_hit(
+    session_factory: async_sessionmaker[AsyncSession], authors: list[Author], statements: list[str]
+):
+    class CachedRepository(AuthorRepository):
+        entity_cache = EntityCache()
+
+    async with session_factory() as session:
+        await CachedRepository(session).get(authors[0].id)
+
+    statements.clear()
+
+    async with session_factory() as session:
+        assert (await CachedRepository(session).get(authors[0].id)).name == "Ursula"
+
+    assert not statements
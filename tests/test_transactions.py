@@ -0,0 +1,34 @@
+import asyncio
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import config
+from tests.models import Author, AuthorRepository
+
+
+class BatchAuthorRepository(AuthorRepository):
+    batch_loading = True
+
+
+@pytest.fixture(params=[True, False], ids=["release", "keep"])
+def release_idle_connections(request, monkeypatch) -> bool:
+    monkeypatch.setattr(config.db, "release_idle_connections", request.param)
+
+    return request.param
+
+
+async def test_concurrent_batched_gets(
+    session: AsyncSession, authors: list[Author], statements: list[str], release_idle_connections: bool
+):
+    repository = BatchAuthorRepository(session)
+    statements.clear()
+
+    results = await asyncio.gather(*[repository.get(author.id) for author in authors])
+
+    assert [result.name for result in results] == [author.name for author in authors]
+    assert sum(statement.startswith("SELECT") for statement in statements) == 1
+    # The connection is released once, after the last of the concurrent reads
+    assert session.in_transaction() is not release_idle_connections
+
+    await session.close()